@@ -0,0 +1,98 @@
+import calendar
+from datetime import date, timedelta
+
+import archive
+import budget_counters
+
+# ------------------ Budget Alerts ------------------
+# evaluate() checks every user with a budget in one set-based pass: spend
+# comes from budget_counters, and the end-of-month projection extrapolates
+# the last RECENT_DAYS of spend (one grouped scan over that date range) over
+# the days left in the month. Users at or above one of the thresholds the
+# Budget Manager uses, or projected to overrun, get a row in budget_alerts
+# for the month; rows for users back under every threshold are removed. An
+# alert is shown once at login and shown again only if it escalates. Runs
+# with the background jobs in the app or as `python maintenance.py alerts`.
+
+THRESHOLDS = (70, 90, 100)
+RECENT_DAYS = 7
+
+_LEVEL = "CASE " + " ".join(
+    f"WHEN spent >= budget * {threshold / 100} THEN {threshold}" for threshold in reversed(THRESHOLDS)
+) + " ELSE 0 END"
+
+EVALUATE_SQL = f"""CREATE TEMP TABLE alert_evaluation AS
+    SELECT username, budget, spent, level, projected FROM (
+        SELECT username, budget, spent, {_LEVEL} AS level,
+               spent + recent / :recent_days * :days_left AS projected
+        FROM (
+            SELECT b.username, b.monthly_budget AS budget,
+                   COALESCE(c.spent, 0) AS spent, COALESCE(r.recent, 0) AS recent
+            FROM budgets b
+            LEFT JOIN budget_counters c ON c.username = b.username AND c.month = :month
+            LEFT JOIN (SELECT username, SUM(amount) AS recent FROM {{source}}
+                       WHERE date > :since AND date <= :today GROUP BY username) r
+                   ON r.username = b.username
+            WHERE b.monthly_budget > 0
+        )
+    )
+    WHERE level > 0 OR projected > budget"""
+
+STORE_SQL = """INSERT INTO budget_alerts (username, month, level, spent, budget, projected)
+               SELECT username, :month, level, spent, budget, projected FROM temp.alert_evaluation WHERE true
+               ON CONFLICT (username, month) DO UPDATE SET
+                   seen = CASE WHEN excluded.level > level THEN 0 ELSE seen END,
+                   level = excluded.level, spent = excluded.spent, budget = excluded.budget,
+                   projected = excluded.projected, evaluated_at = datetime('now')"""
+
+
+def evaluate(conn, today=None):
+    # Rewrites this month's alerts for every user in the database; returns the
+    # number of users with an alert
+    today = today or date.today()
+    days_left = calendar.monthrange(today.year, today.month)[1] - today.day
+    params = {
+        "month": budget_counters.current_month(today),
+        "today": today.isoformat(),
+        "since": (today - timedelta(days=RECENT_DAYS)).isoformat(),
+        "recent_days": float(RECENT_DAYS),
+        "days_left": days_left,
+    }
+    # Early in January the recent window reaches last year, which may be archived
+    source = archive.source(conn, params["since"], params["today"])
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DROP TABLE IF EXISTS temp.alert_evaluation")
+        conn.execute(EVALUATE_SQL.format(source=source), params)
+        conn.execute("""DELETE FROM budget_alerts WHERE month = :month
+                        AND username NOT IN (SELECT username FROM temp.alert_evaluation)""", params)
+        conn.execute(STORE_SQL, params)
+        count = conn.execute("SELECT COUNT(*) FROM temp.alert_evaluation").fetchone()[0]
+        conn.execute("DROP TABLE temp.alert_evaluation")
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return count
+
+
+def evaluate_all(backend):
+    count = 0
+    for pool in backend.pools():
+        with pool.connection() as conn:
+            count += evaluate(conn)
+    return count
+
+
+def take_unseen(conn, username, today=None):
+    # This month's alert for the user if not shown yet, marked as shown
+    month = budget_counters.current_month(today)
+    with conn:
+        row = conn.execute(
+            "SELECT level, spent, budget, projected FROM budget_alerts WHERE username = ? AND month = ? AND seen = 0",
+            (username, month),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE budget_alerts SET seen = 1 WHERE username = ? AND month = ?", (username, month))
+    return dict(zip(("level", "spent", "budget", "projected"), row), month=month)
@@ -0,0 +1,166 @@
+import argparse
+import base64
+import json
+import os
+import re
+import sys
+import traceback
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import archive
+import auth
+import core
+import instrumentation
+import storage
+import versions
+
+# ------------------ JSON API ------------------
+# A small read-only HTTP API over core.py for clients that are not the
+# Streamlit app. Requests authenticate with HTTP Basic auth against the
+# app's users and always see the authenticated user's own data:
+#   GET /api/dashboard
+#   GET /api/analysis?start=YYYY-MM-DD&end=YYYY-MM-DD&resolution=Auto|Day|Week|Month
+#   GET /api/reports/YYYY-MM   or   /api/reports/YYYY
+# Every response carries an ETag built from the user's persisted data
+# version and today's date. A request whose If-None-Match still matches is
+# answered 304 Not Modified after one primary-key lookup, without running
+# any summary query, so polling clients cost almost nothing.
+#
+#   python api.py [--host 127.0.0.1] [--port 8600]
+
+HOST = os.environ.get("EXPENSE_API_HOST", "127.0.0.1")
+PORT = int(os.environ.get("EXPENSE_API_PORT", "8600"))
+
+_PERIOD = re.compile(r"\d{4}(-(0[1-9]|1[0-2]))?")
+
+
+def _dashboard(conn, username, params):
+    return core.dashboard(conn, username)
+
+
+def _analysis(conn, username, params):
+    start, end = (date.fromisoformat(params[name][0]) if name in params else None for name in ("start", "end"))
+    resolution = params.get("resolution", ["Auto"])[0]
+    if resolution not in ("Auto", "Day", "Week", "Month"):
+        raise ValueError(f"unknown resolution {resolution!r}")
+    return core.analysis(conn, username, start, end, resolution)
+
+
+def _report(conn, username, params, period):
+    return core.report(conn, username, period)
+
+
+ROUTES = [
+    (re.compile(r"/api/dashboard"), _dashboard),
+    (re.compile(r"/api/analysis"), _analysis),
+    (re.compile(r"/api/reports/(?P<period>\d{4}(?:-\d{2})?)"), _report),
+]
+
+
+def etag(version, today=None):
+    # Summaries also depend on the date (last 7 days, the open month)
+    return f'"{version}-{(today or date.today()).isoformat()}"'
+
+
+def etag_matches(header, tag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "ExpenseAPI/1.0"
+    backend = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        for pattern, view in ROUTES:
+            match = pattern.fullmatch(url.path)
+            if match:
+                break
+        else:
+            return self._send_error(HTTPStatus.NOT_FOUND, "unknown endpoint")
+
+        username = self._authenticate()
+        if username is None:
+            return
+        kwargs = match.groupdict()
+        if "period" in kwargs and not _PERIOD.fullmatch(kwargs["period"]):
+            return self._send_error(HTTPStatus.BAD_REQUEST, "period must be YYYY or YYYY-MM")
+
+        archive.refresh()
+        with self.backend.connection(username) as conn:
+            tag = etag(versions.get(conn, username))
+            if etag_matches(self.headers.get("If-None-Match"), tag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", tag)
+                self.end_headers()
+                return
+            try:
+                with instrumentation.timer(f"api:{view.__name__.lstrip('_')}"):
+                    payload = view(conn, username, parse_qs(url.query), **kwargs)
+            except ValueError as e:
+                return self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            except Exception:
+                # The client still gets a JSON answer; the traceback goes to stderr
+                traceback.print_exc()
+                return self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "internal error")
+        self._send_json(HTTPStatus.OK, payload, {"ETag": tag, "Cache-Control": "private, no-cache"})
+
+    def _authenticate(self):
+        # Returns the username, or sends 401 and returns None
+        header = self.headers.get("Authorization", "")
+        if header.startswith("Basic "):
+            try:
+                username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+            except ValueError:
+                username = password = ""
+            if username and self.backend.check_password(username, auth.hash_password(password)):
+                return username
+        self._send_error(HTTPStatus.UNAUTHORIZED, "valid credentials required",
+                         {"WWW-Authenticate": 'Basic realm="expenses"'})
+        return None
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+
+def make_server(backend, host=HOST, port=PORT):
+    handler = type("BoundHandler", (Handler,), {"backend": backend})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve per-user expense summaries as JSON.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+
+    server = make_server(storage.get_backend(), args.host, args.port)
+    print(f"Serving the expense API on http://{args.host}:{server.server_address[1]}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
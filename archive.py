@@ -0,0 +1,201 @@
+import os
+import sqlite3
+from datetime import date
+
+from dates import to_iso
+
+# ------------------ Cold-Year Archive ------------------
+# Closed years can be moved out of the hot database into one archive
+# database per year, next to it ({name}-archive{year}.db). The hot database
+# records them in archived_years and keeps its monthly_rollup and report
+# snapshots, so Yearly Overview and the other rollup-based reports never
+# open an archive. Queries that read expense rows ask source() which table
+# to read: plain `expenses` while their date range stays in hot years;
+# otherwise the archives the range reaches are ATTACHed to that connection
+# (once, since pooled connections are reused) and the temp view
+# all_expenses unions them with the hot table. Each user's first and last
+# date and largest amount in every archived year are kept in
+# archived_user_years, so all-time figures (the Dashboard, the default date
+# filters) never open an archive either. Archived notes are dropped from the
+# note search index. Pooled connections remember the archived years they
+# last read, so users with nothing archived pay no extra query; refresh()
+# makes every connection read them again, and runs at the start of each
+# rerun, API request and background job pass.
+#
+#   python maintenance.py archive [--db database.db] [--before YEAR] [--vacuum]
+
+SCHEMA_PREFIX = "archive_"
+COLUMNS = "id, username, date, category, amount, note, payment_method"
+
+ARCHIVE_TABLE = '''CREATE TABLE IF NOT EXISTS {schema}.expenses (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    note TEXT,
+    payment_method TEXT
+)'''
+
+ARCHIVE_INDEX = "CREATE INDEX IF NOT EXISTS {schema}.idx_expenses_user_date ON expenses (username, date)"
+
+_generation = 0
+
+
+def archive_path(db_path, year):
+    root, ext = os.path.splitext(db_path)
+    return f"{root}-archive{year}{ext or '.db'}"
+
+
+def _schema(year):
+    return f"{SCHEMA_PREFIX}{year}"
+
+
+def _year_bounds(year):
+    return f"{year}-01-01", f"{year + 1}-01-01"
+
+
+def refresh():
+    # Archives written since, by this process or another, are seen from here on
+    global _generation
+    _generation += 1
+
+
+def archived_years(conn):
+    remembered = getattr(conn, "archived_years", None)
+    if remembered is not None and remembered[0] == _generation:
+        return remembered[1]
+    years = conn.execute("SELECT year, path FROM archived_years ORDER BY year").fetchall()
+    try:
+        conn.archived_years = (_generation, years)
+    except AttributeError:
+        pass  # a plain sqlite3 connection rather than a pooled one
+    return years
+
+
+def hot_start(conn):
+    # First day after the last archived year; None when nothing is archived
+    years = archived_years(conn)
+    return date(years[-1][0] + 1, 1, 1) if years else None
+
+
+def user_summary(conn, username):
+    # (first date, last date, largest amount) over the user's archived
+    # expenses; all None when none are archived
+    if not archived_years(conn):
+        return None, None, None
+    return conn.execute(
+        """SELECT MIN(first_date), MAX(last_date), MAX(max_amount) FROM archived_user_years
+           WHERE username = ?""",
+        (username,),
+    ).fetchone()
+
+
+def _summarize(conn, year):
+    # Runs inside the caller's transaction, with the year's archive attached
+    conn.execute("DELETE FROM archived_user_years WHERE year = ?", (year,))
+    conn.execute(
+        f"""INSERT INTO archived_user_years (username, year, first_date, last_date, max_amount)
+            SELECT username, ?, MIN(date), MAX(date), MAX(amount) FROM {_schema(year)}.expenses
+            GROUP BY username""",
+        (year,),
+    )
+
+
+def _attached(conn):
+    # Archive schema name -> year for the archives attached to this connection
+    return {name: int(name[len(SCHEMA_PREFIX):]) for _, name, _ in conn.execute("PRAGMA database_list")
+            if name.startswith(SCHEMA_PREFIX)}
+
+
+def _create_view(conn, years):
+    conn.execute("DROP VIEW IF EXISTS temp.all_expenses")
+    arms = [f"SELECT {COLUMNS} FROM main.expenses"]
+    arms += [f"SELECT {COLUMNS} FROM {_schema(year)}.expenses" for year in sorted(years)]
+    conn.execute(f"CREATE TEMP VIEW all_expenses AS {' UNION ALL '.join(arms)}")
+
+
+def source(conn, start=None, end=None):
+    # The table expression to read expenses dated between start and end
+    # (inclusive, None for unbounded) from; it is always aliased `expenses`
+    first = int(to_iso(start)[:4]) if start is not None else None
+    last = int(to_iso(end)[:4]) if end is not None else None
+    needed = {year: path for year, path in archived_years(conn)
+              if (first is None or year >= first) and (last is None or year <= last)}
+    if not needed:
+        return "expenses"
+    attached = _attached(conn)
+    missing = {year: path for year, path in needed.items() if _schema(year) not in attached}
+    if missing:
+        if conn.in_transaction:
+            raise RuntimeError("archives must be attached outside a transaction; call archive.source() first")
+        # archive_year() keeps the archive count within SQLite's attach limit
+        conn.execute("DROP VIEW IF EXISTS temp.all_expenses")
+        for year, path in missing.items():
+            conn.execute(f"ATTACH DATABASE ? AS {_schema(year)}", (path,))
+            attached[_schema(year)] = year
+        _create_view(conn, attached.values())
+    return "all_expenses AS expenses"
+
+
+def archive_year(conn, db_path, year, today=None):
+    # Moves one closed year's expenses into its archive database; returns the
+    # number of rows moved. Copy and delete are separate transactions (WAL
+    # commits are not atomic across attached files), so an interrupted run
+    # can leave rows in both until it is run again.
+    if year >= (today or date.today()).year:
+        raise ValueError(f"{year} is not a closed year")
+    # An all-time query attaches every archive at once
+    years = [archived for archived, _ in archived_years(conn)]
+    if year not in years and len(years) >= conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+        raise ValueError(f"already {len(years)} archived years, the most SQLite can attach at once")
+    path = archive_path(db_path, year)
+    schema = _schema(year)
+    if schema not in _attached(conn):
+        conn.execute("DROP VIEW IF EXISTS temp.all_expenses")
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    first, after = _year_bounds(year)
+    with conn:
+        conn.execute(ARCHIVE_TABLE.format(schema=schema))
+        conn.execute(ARCHIVE_INDEX.format(schema=schema))
+        conn.execute(f"""INSERT OR IGNORE INTO {schema}.expenses ({COLUMNS})
+                         SELECT {COLUMNS} FROM main.expenses WHERE date >= ? AND date < ?""", (first, after))
+    with conn:
+        moved = conn.execute(
+            f"""DELETE FROM main.expenses WHERE date >= ? AND date < ?
+                AND id IN (SELECT id FROM {schema}.expenses)""",
+            (first, after),
+        ).rowcount
+        rows = conn.execute(f"SELECT COUNT(*) FROM {schema}.expenses").fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO archived_years (year, path, rows) VALUES (?, ?, ?)", (year, path, rows))
+        _summarize(conn, year)
+    refresh()
+    _create_view(conn, _attached(conn).values())
+    return moved
+
+
+def closed_years(conn, before=None):
+    # Years before `before` (default: the current year) with rows in the hot table
+    before = min(before or date.today().year, date.today().year)
+    rows = conn.execute("SELECT DISTINCT CAST(substr(date, 1, 4) AS INTEGER) FROM expenses WHERE date < ? ORDER BY 1",
+                        (f"{before}-01-01",))
+    return [row[0] for row in rows]
+
+
+def archive_all(backend, before=None, vacuum=False):
+    # Returns {db path: {year: rows moved}}
+    moved = {}
+    for pool in backend.pools():
+        if pool.path.startswith("file:"):
+            continue  # in-memory databases have no directory to archive next to
+        with pool.connection() as conn:
+            # Years archived before per-user summaries were kept
+            for (year,) in conn.execute("""SELECT year FROM archived_years
+                                           WHERE year NOT IN (SELECT year FROM archived_user_years)""").fetchall():
+                source(conn, f"{year}-01-01", f"{year}-12-31")
+                with conn:
+                    _summarize(conn, year)
+            moved[pool.path] = {year: archive_year(conn, pool.path, year) for year in closed_years(conn, before)}
+            if vacuum and moved[pool.path]:
+                conn.execute("VACUUM main")
+    return moved
@@ -0,0 +1,8 @@
+import hashlib
+
+# ------------------ Password Hashing ------------------
+# Shared by the Streamlit app and the JSON API, which check the same users.
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
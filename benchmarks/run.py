@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from streamlit.testing.v1 import AppTest
+
+import db
+import storage
+from benchmarks import synthetic
+from cache import expense_cache, figure_cache
+
+# ------------------ Page Benchmarks ------------------
+# Renders every page of app.py headlessly through Streamlit's AppTest against
+# seeded synthetic databases of increasing size, and records wall time,
+# SQL statement count and peak Python memory per page. Cold numbers start
+# from an empty result cache; warm numbers are an immediate rerun.
+#
+#   python -m benchmarks.run                      # compare against baseline.json
+#   python -m benchmarks.run --save               # record a new baseline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# (name, page, report type)
+SCENARIOS = [
+    ("Dashboard", "Dashboard", None),
+    ("Add Expense", "Add Expense", None),
+    ("View Expenses", "View Expenses", None),
+    ("Analysis", "Analysis", None),
+    ("Budget Manager", "Budget Manager", None),
+    ("Reports: Monthly Summary", "Reports", "Monthly Summary"),
+    ("Reports: Category Breakdown", "Reports", "Category Breakdown"),
+    ("Reports: Yearly Overview", "Reports", "Yearly Overview"),
+]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def install(self, conn):
+        conn.set_trace_callback(self.trace)
+
+    def trace(self, statement):
+        self.count += 1
+
+
+def _run(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError("\n".join(e.message for e in at.exception))
+
+
+def _open_page(user, page, report_type):
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.session_state.logged_in = True
+    at.session_state.username = user
+    at.session_state.user_choice = page
+    _run(at)
+    if report_type:
+        next(s for s in at.selectbox if "Report Type" in s.label).set_value(report_type)
+        _run(at)
+        if report_type == "Monthly Summary":
+            next(s for s in at.selectbox if s.label == "Select Month").set_value(date.today().month)
+            _run(at)
+    return at
+
+
+def measure(at, counter, repeat):
+    cold, warm = [], []
+    for _ in range(repeat):
+        expense_cache.clear()
+        figure_cache.clear()
+        counter.count = 0
+        started = time.perf_counter()
+        _run(at)
+        cold.append((time.perf_counter() - started) * 1000)
+        cold_queries = counter.count
+
+        counter.count = 0
+        started = time.perf_counter()
+        _run(at)
+        warm.append((time.perf_counter() - started) * 1000)
+        warm_queries = counter.count
+
+    expense_cache.clear()
+    figure_cache.clear()
+    tracemalloc.start()
+    _run(at)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "cold_ms": round(statistics.median(cold), 2),
+        "warm_ms": round(statistics.median(warm), 2),
+        "cold_queries": cold_queries,
+        "warm_queries": warm_queries,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(sizes, users, repeat, seed):
+    counter = QueryCounter()
+    db.CONNECT_HOOKS.append(counter.install)
+    results = {}
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                db.close_all()
+                db.DB_PATH = os.path.join(tmp, "bench.db")
+                started = time.perf_counter()
+                names = synthetic.populate(db.DB_PATH, users, size, seed=seed)
+                storage.set_backend(storage.SQLiteBackend(db.DB_PATH))
+                print(f"\n{users} users x {size:,} expenses (generated in {time.perf_counter() - started:.1f}s)")
+                results[str(size)] = {}
+                for name, page, report_type in SCENARIOS:
+                    at = _open_page(names[0], page, report_type)
+                    results[str(size)][name] = stats = measure(at, counter, repeat)
+                    print(f"  {name:<30} cold {stats['cold_ms']:>9.1f} ms  warm {stats['warm_ms']:>8.1f} ms  "
+                          f"queries {stats['cold_queries']:>3}/{stats['warm_queries']:<3}  peak {stats['peak_kib']:>9.1f} KiB")
+                db.close_all()
+    finally:
+        db.CONNECT_HOOKS.remove(counter.install)
+        storage.set_backend(None)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # A page regresses when it gets slower than the tolerance allows (with a
+    # few milliseconds of slack for noise) or issues more SQL statements
+    regressions = []
+    for size, pages in results.items():
+        for name, stats in pages.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before:
+                continue
+            if stats["cold_ms"] > before["cold_ms"] * (1 + tolerance) + 5:
+                regressions.append(f"{name} @ {size}: cold {before['cold_ms']} -> {stats['cold_ms']} ms")
+            if stats["cold_queries"] > before["cold_queries"]:
+                regressions.append(f"{name} @ {size}: queries {before['cold_queries']} -> {stats['cold_queries']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every page of app.py on synthetic data.")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated expenses per user")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = run(sizes, args.users, args.repeat, args.seed)
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "users": args.users,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline to compare against; run with --save to create one")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ------------------ Startup Benchmark ------------------
+# Measures what a fresh server process pays before its first paint. Each
+# sample runs in a new interpreter so no module is already imported:
+#   - import: importing streamlit itself, which every app pays
+#   - login: first run of app.py up to the rendered login screen
+#   - first page: the Dashboard run right after logging in, including the
+#     page modules, pandas and plotly it imports on first use
+# It also reports which heavy modules the login screen loaded, which should
+# be none of them.
+#
+#   python -m benchmarks.startup [--repeat 5] [--output startup.json]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+HEAVY_MODULES = ["pandas", "numpy", "plotly.express", "pyarrow", "queries", "frames"]
+
+
+def child(username):
+    # Runs in the fresh interpreter and prints one JSON sample
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter()
+
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.run()
+    login_done = time.perf_counter()
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    at.session_state.logged_in = True
+    at.session_state.username = username
+    at.session_state.user_choice = "Dashboard"
+    at.run()
+    first_page_done = time.perf_counter()
+    if at.exception:
+        raise RuntimeError("\n".join(e.message for e in at.exception))
+
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "login_ms": (login_done - imported) * 1000,
+        "first_page_ms": (first_page_done - login_done) * 1000,
+        "login_loaded": loaded,
+    }))
+
+
+def run(repeat, expenses, seed):
+    # Imported here, not at the top, so the child interpreter (which runs this
+    # module too) does not load the query layer before measuring
+    from benchmarks import synthetic
+
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        username = synthetic.populate(path, 1, expenses, seed=seed)[0]
+        env = dict(os.environ, EXPENSE_DB=path, EXPENSE_BACKEND="sqlite")
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", "--child", username],
+                cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "login_ms": round(statistics.median(s["login_ms"] for s in samples), 1),
+        "first_page_ms": round(statistics.median(s["first_page_ms"] for s in samples), 1),
+        "login_loaded": sorted({name for s in samples for name in s["login_loaded"]}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app.py time to first paint in fresh processes.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--expenses", type=int, default=1000, help="expenses for the benchmark user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--child", metavar="USERNAME", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child)
+        return 0
+
+    results = run(args.repeat, args.expenses, args.seed)
+    print(f"import streamlit  {results['import_ms']:>8.1f} ms")
+    print(f"login screen      {results['login_ms']:>8.1f} ms")
+    print(f"first page        {results['first_page_ms']:>8.1f} ms")
+    print(f"heavy modules on the login screen: {', '.join(results['login_loaded']) or 'none'}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if results["login_loaded"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import argparse
+import hashlib
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import archive
+import budget_counters
+import db
+import dedupe
+import rollups
+from queries import CATEGORIES, PAYMENT_METHODS
+
+# ------------------ Synthetic Data ------------------
+# Seeded generator of N users x M expenses with realistic category and
+# payment-method mixes spread over several years. The same seed always
+# produces the same rows relative to the chosen end date.
+
+PASSWORD = "benchmark"
+
+# (share of transactions, typical amount in rupees)
+CATEGORY_PROFILE = {
+    "Food": (0.34, 250),
+    "Transport": (0.18, 150),
+    "Bills": (0.08, 2200),
+    "Shopping": (0.14, 1400),
+    "Entertainment": (0.09, 600),
+    "Health": (0.06, 900),
+    "Education": (0.03, 3500),
+    "Other": (0.08, 400),
+}
+MONTHLY_BUDGETS = [15000, 25000, 40000, 60000]
+PAYMENT_SHARES = {"UPI": 0.45, "Cash": 0.18, "Debit Card": 0.15, "Credit Card": 0.16, "Net Banking": 0.06}
+NOTES = ["", "", "", "groceries", "rent", "flight", "dinner with friends", "fuel", "electricity bill",
+         "movie tickets", "pharmacy", "school fees", "auto fare", "online order", "gift"]
+
+assert set(CATEGORY_PROFILE) == set(CATEGORIES) and set(PAYMENT_SHARES) == set(PAYMENT_METHODS)
+
+
+def username(index):
+    return f"bench_user_{index}"
+
+
+def generate_rows(rng, user, count, end, years):
+    categories = list(CATEGORY_PROFILE)
+    category_weights = [CATEGORY_PROFILE[c][0] for c in categories]
+    payments = list(PAYMENT_SHARES)
+    payment_weights = list(PAYMENT_SHARES.values())
+    span = 365 * years
+    for _ in range(count):
+        category = rng.choices(categories, category_weights)[0]
+        amount = round(rng.lognormvariate(0, 0.6) * CATEGORY_PROFILE[category][1], 2)
+        # Recent days are busier than old ones
+        day = end - timedelta(days=int(span * rng.random() ** 1.5))
+        yield (user, day.isoformat(), category, amount, rng.choice(NOTES),
+               rng.choices(payments, payment_weights)[0])
+
+
+def populate(path, users, expenses_per_user, years=3, seed=42, end=None):
+    # Creates (or extends) the database at `path` and returns the usernames
+    end = end or date.today()
+    rng = random.Random(seed)
+    names = [username(i) for i in range(users)]
+    password = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    with db.connection(path) as conn:
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                             [(name, password, end.isoformat()) for name in names])
+            conn.executemany("INSERT OR REPLACE INTO budgets (username, monthly_budget) VALUES (?, ?)",
+                             [(name, rng.choice(MONTHLY_BUDGETS)) for name in names])
+        for name in names:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO expenses (username, date, category, amount, note, payment_method) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    generate_rows(rng, name, expenses_per_user, end, years),
+                )
+        # Extending a database with archived years keeps their rollups
+        source = archive.source(conn)
+        with conn:
+            rollups.rebuild(conn, source=source)
+            budget_counters.rebuild(conn)
+            dedupe.backfill(conn)
+        conn.execute("ANALYZE")
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a database with seeded synthetic expenses.")
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--expenses", type=int, default=1000, help="expenses per user")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    populate(args.db, args.users, args.expenses, args.years, args.seed)
+    with sqlite3.connect(args.db) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+    print(f"{args.db}: {args.users} users, {total:,} expenses (password '{PASSWORD}')")
+
+
+if __name__ == "__main__":
+    main()
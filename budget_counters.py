@@ -0,0 +1,104 @@
+from datetime import date
+
+import versions
+from cache import expense_cache
+
+# ------------------ Month-To-Date Budget Counters ------------------
+# budget_counters keeps one row per user with the month it counts and that
+# month's running spend. Expense writes dated in the current month add to it
+# in the same transaction as the rollup update. The first such write in a new
+# month (or for a user with no row yet) resets the row from monthly_rollup,
+# which the write has already updated, so the counter rolls over without a
+# scheduled job. Until then budget_status() falls back to the rollup rows.
+# reconcile() compares every counter against the raw expenses and repairs
+# drift; it runs with the background jobs and as
+# `python maintenance.py reconcile`.
+
+ADD_SQL = "UPDATE budget_counters SET spent = spent + ?, count = count + ? WHERE username = ? AND month = ?"
+
+RESET_SQL = """INSERT OR REPLACE INTO budget_counters (username, month, spent, count)
+               SELECT ?, ?, COALESCE(SUM(total), 0), COALESCE(SUM(count), 0)
+               FROM monthly_rollup WHERE username = ? AND month = ?"""
+
+
+def current_month(today=None):
+    return (today or date.today()).strftime("%Y-%m")
+
+
+def apply(conn, username, month, amount, count=1, today=None):
+    # Runs inside the caller's transaction, after the rollup update; month is
+    # the expense's "YYYY-MM" and writes to other months are ignored
+    current = current_month(today)
+    if month != current:
+        return
+    if conn.execute(ADD_SQL, (amount, count, username, current)).rowcount == 0:
+        conn.execute(RESET_SQL, (username, current, username, current))
+
+
+def budget_status(conn, username, today=None):
+    # Budget and month-to-date spend from two primary-key lookups in one statement
+    current = current_month(today)
+    budget, month, spent = conn.execute(
+        """SELECT (SELECT monthly_budget FROM budgets WHERE username = ?), month, spent
+           FROM (SELECT 1) LEFT JOIN budget_counters ON username = ?""",
+        (username, username),
+    ).fetchone()
+    if month != current:
+        # No write yet this month; the rollup rows are still exact
+        spent = conn.execute("SELECT COALESCE(SUM(total), 0) FROM monthly_rollup WHERE username = ? AND month = ?",
+                             (username, current)).fetchone()[0]
+    return {"budget": budget or 0, "spent": spent or 0, "month": current}
+
+
+def rebuild(conn, username=None, today=None):
+    # Runs inside the caller's transaction
+    current = current_month(today)
+    where, params = ("AND username = ?", (username,)) if username is not None else ("", ())
+    conn.execute(f"DELETE FROM budget_counters WHERE 1 {where}", params)
+    conn.execute(
+        f"""INSERT INTO budget_counters (username, month, spent, count)
+            SELECT username, month, SUM(total), SUM(count) FROM monthly_rollup
+            WHERE month = ? {where} GROUP BY username, month""",
+        (current,) + params,
+    )
+
+
+def reconcile(conn, today=None):
+    # Checks every counter against the raw expenses of the current month and
+    # rewrites the ones that drifted; returns (username, stored, actual) for each
+    current = current_month(today)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        drifted = conn.execute(
+            """WITH actual AS (
+                   SELECT username, SUM(amount) AS spent, COUNT(*) AS count FROM expenses
+                   WHERE date >= ? AND date < ? GROUP BY username
+               )
+               SELECT c.username, c.spent, COALESCE(a.spent, 0), COALESCE(a.count, 0)
+               FROM budget_counters c LEFT JOIN actual a USING (username)
+               WHERE c.month = ? AND (c.count != COALESCE(a.count, 0)
+                                      OR abs(c.spent - COALESCE(a.spent, 0)) > 0.005)""",
+            (f"{current}-01", f"{current}-32", current),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE budget_counters SET spent = ?, count = ? WHERE username = ?",
+            ((spent, count, username) for username, _, spent, count in drifted),
+        )
+        for username, _, _, _ in drifted:
+            versions.bump(conn, username)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    # Cached budget status would otherwise keep the drifted figure until it expires
+    for username, _, _, _ in drifted:
+        expense_cache.bump(username)
+    return [(username, stored, spent) for username, stored, spent, _ in drifted]
+
+
+def reconcile_all(backend):
+    drifted = []
+    for pool in backend.pools():
+        with pool.connection() as conn:
+            drifted += reconcile(conn)
+    return drifted
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ------------------ Per-User Cache ------------------
+# Query results are cached per user under a data version that every write
+# path bumps, so a rerun that changes nothing is served from memory. Users
+# are evicted least-recently-used beyond MAX_USERS, entries expire after
+# TTL_SECONDS, and each user keeps at most MAX_ENTRIES_PER_USER results.
+# Writes from other processes (the import CLI, maintenance commands) only
+# show up in data_versions; sync() compares it once per rerun.
+
+MAX_USERS = 256
+MAX_ENTRIES_PER_USER = 64
+TTL_SECONDS = 600
+MAX_FIGURES_PER_USER = 32
+
+
+class UserCache:
+    def __init__(self, max_users=MAX_USERS, max_entries=MAX_ENTRIES_PER_USER, ttl=TTL_SECONDS, dependents=()):
+        self.max_users = max_users
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._users = OrderedDict()  # username -> OrderedDict(key -> (version, stored_at, value))
+        self._versions = {}
+        self._data_versions = {}  # username -> data_versions value seen by the last sync()
+        self.dependents = list(dependents)  # caches derived from this one, bumped with it
+
+    def version(self, username):
+        return self._versions.get(username, 0)
+
+    def bump(self, username):
+        # Called by every write path; stale entries are dropped right away
+        with self._lock:
+            self._versions[username] = self._versions.get(username, 0) + 1
+            self._users.pop(username, None)
+        for cache in self.dependents:
+            cache.bump(username)
+
+    def sync(self, username, data_version):
+        # Drops the user's entries if the stored data version moved since the
+        # last call. Local writes move it as well, so whatever was cached after
+        # one is reloaded once more
+        with self._lock:
+            seen = self._data_versions.get(username)
+            self._data_versions[username] = data_version
+        if seen is not None and seen != data_version:
+            self.bump(username)
+
+    def get(self, username, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(username, 0)
+            entries = self._users.get(username)
+            if entries is not None:
+                self._users.move_to_end(username)
+                hit = entries.get(key)
+                if hit is not None and hit[0] == version and now - hit[1] < self.ttl:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return hit[2]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # A write that landed while we computed makes this result stale
+            if self._versions.get(username, 0) != version:
+                return value
+            entries = self._users.setdefault(username, OrderedDict())
+            self._users.move_to_end(username)
+            entries[key] = (version, now, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return value
+
+    def memory_usage(self, username):
+        # Approximate bytes held for one user's cached results. frames is
+        # imported here since it loads pandas, which the login screen avoids.
+        import frames
+        with self._lock:
+            values = [entry[2] for entry in self._users.get(username, {}).values()]
+        return sum(frames.memory_bytes(v) for v in values)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._users),
+                "entries": sum(len(e) for e in self._users.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Built Plotly figures, keyed by page, chart and filters, derived from the
+# query results and dropped whenever they are
+figure_cache = UserCache(max_entries=MAX_FIGURES_PER_USER)
+expense_cache = UserCache(dependents=[figure_cache])
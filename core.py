@@ -0,0 +1,88 @@
+import calendar
+from datetime import date
+
+import budget_counters
+import queries
+import trends
+
+# ------------------ Core Summaries ------------------
+# The numbers behind the Dashboard, Analysis and Reports pages as plain
+# dicts and lists, with no Streamlit involved. The pages use the derived
+# figures from here, and the JSON API (api.py) serves whole summaries.
+# Every function takes (conn, username, ...) like the queries it is built
+# from, so it also works with Backend.query.
+
+
+def records(df):
+    # A frame as a list of row dicts; dates become ISO strings
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype.kind == "M":
+            df[column] = df[column].dt.strftime("%Y-%m-%d")
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def budget_progress(budget, spent):
+    remaining = budget - spent if budget > 0 else 0
+    percentage = spent / budget * 100 if budget > 0 else 0
+    return {"budget": budget, "spent": spent, "remaining": remaining, "percentage": percentage}
+
+
+def period_averages(report):
+    # Daily average over the days up to the last expense for a month; monthly
+    # and daily averages over the whole year for a year
+    if not report["count"]:
+        return {"daily_average": 0, "monthly_average": 0}
+    if len(report["period"]) == 7:
+        return {"daily_average": report["total"] / int(report["last_date"][8:10]),
+                "monthly_average": report["total"]}
+    days = 366 if calendar.isleap(int(report["period"])) else 365
+    return {"daily_average": report["total"] / days, "monthly_average": report["total"] / 12}
+
+
+def dashboard(conn, username, today=None):
+    today = today or date.today()
+    summary = queries.dashboard_summary(conn, username, today)
+    status = budget_counters.budget_status(conn, username, today)
+    categories = queries.rollup_category_totals(conn, username)
+    return {
+        "total": summary["total"],
+        "month": budget_progress(status["budget"], status["spent"]),
+        "week": summary["week"],
+        "count": summary["count"],
+        "average": summary["average"],
+        "max": summary["max"],
+        "top_category": categories["category"].iloc[0] if len(categories) else None,
+        "categories": records(categories),
+        "months": records(queries.monthly_totals(conn, username)),
+    }
+
+
+def analysis(conn, username, start=None, end=None, resolution="Auto"):
+    first, last = queries.date_bounds(conn, username)
+    if first is None:
+        return {"start": None, "end": None, "total": 0, "count": 0, "average": 0, "max": 0,
+                "categories": [], "trend": [], "resolution": None, "weekdays": [], "payment_methods": []}
+    start, end = start or first, end or last
+    resolution = trends.pick_resolution(start, end, resolution)
+    totals = queries.totals(conn, username, start, end)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "total": totals["total"],
+        "count": totals["count"],
+        "average": totals["average"],
+        "max": totals["max"],
+        "categories": records(queries.category_totals(conn, username, start, end)),
+        "resolution": resolution,
+        "trend": records(queries.trend_totals(conn, username, start, end, resolution)),
+        "weekdays": records(queries.weekday_totals(conn, username, start, end)),
+        "payment_methods": records(queries.payment_totals(conn, username, start, end)),
+    }
+
+
+def report(conn, username, period):
+    # period is "YYYY-MM" or "YYYY"
+    result = dict(queries.period_report(conn, username, period))
+    result.update(period_averages(result))
+    return result
@@ -0,0 +1,30 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+# ------------------ Canonical Dates ------------------
+# Expense dates are stored as ISO "YYYY-MM-DD" text, which sorts and compares
+# correctly, so date filters are plain index range predicates.
+
+DATE_FORMATS = ["%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d %b %Y", "%d %B %Y"]
+
+
+def to_iso(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, date) else value
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    # Exports repeat the same few dates thousands of times, so parse each once
+    value = value.strip()
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
@@ -0,0 +1,145 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import instrumentation
+import migrations
+
+# ------------------ Connection Manager ------------------
+# Each Streamlit session thread checks a connection out of a bounded pool for
+# the duration of one query or write, instead of sharing one global
+# connection and cursor. Connections run in WAL mode so readers never wait
+# for a writer, and writers wait up to BUSY_TIMEOUT_MS for the write lock.
+
+DB_PATH = os.environ.get("EXPENSE_DB", "database.db")
+POOL_SIZE = 8
+CHECKOUT_TIMEOUT = 30
+BUSY_TIMEOUT_MS = 5000
+
+# Callables run on every new connection, e.g. to install a trace callback
+CONNECT_HOOKS = []
+
+
+def configure(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable across application crashes in WAL mode and avoids an
+    # fsync on every commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    for hook in CONNECT_HOOKS:
+        hook(conn)
+    return conn
+
+
+class Connection(instrumentation.connection_factory()):
+    # Pooled connections can carry state between checkouts, such as the
+    # archived years archive.py last read
+    archived_years = None
+
+
+def open_connection(path=None):
+    # Pooled connections move between threads, but only one holds each at a time
+    # "file:" paths are URIs, e.g. in-memory databases
+    path = path or DB_PATH
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                           factory=Connection, uri=path.startswith("file:"))
+    return configure(conn)
+
+
+class ConnectionPool:
+    def __init__(self, path=None, size=POOL_SIZE):
+        self.path = path or DB_PATH
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return open_connection(self.path)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=CHECKOUT_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError(f"No database connection available after {CHECKOUT_TIMEOUT}s") from None
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            # Never hand the next caller a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=None, size=POOL_SIZE):
+    # Schema migrations run once per process, when a database is first used;
+    # size only applies to the call that creates the pool
+    path = path or DB_PATH
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = ConnectionPool(path, size)
+            with pool.connection() as conn:
+                migrations.migrate(conn)
+            _pools[path] = pool
+        return pool
+
+
+def close_pool(path):
+    with _pools_lock:
+        pool = _pools.pop(path, None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def connection(path=None):
+    return get_pool(path).connection()
+
+
+def optimize_all(backend):
+    # Refreshes planner statistics for tables that grew since they were last
+    # analyzed; the migrations analyze expenses while it is still small
+    for pool in backend.pools():
+        with pool.connection() as conn:
+            conn.execute("PRAGMA optimize")
@@ -0,0 +1,96 @@
+import hashlib
+from collections import Counter
+
+import budget_counters
+import rollups
+import snapshots
+import versions
+from cache import expense_cache
+
+# ------------------ Duplicate Detection ------------------
+# Every expense stores a 64-bit fingerprint of its content: username, date,
+# category, amount in paise, payment method and the note with case and
+# whitespace folded. The (username, fingerprint) index turns "is this
+# expense already recorded?" into one index probe:
+#   - the Add Expense form refuses an exact repeat unless the user confirms
+#   - the importer skips rows the database already holds, counting repeats,
+#     so re-importing a file adds nothing while a file's own repeated rows
+#     (two identical coffees) still import the first time
+#   - `python maintenance.py dedupe` lists existing duplicates with one grouped pass over
+#     the index, and --merge keeps the oldest copy of each
+# Fingerprints cover the hot database; archived years are not checked.
+
+DUPLICATE_SQL = "SELECT 1 FROM expenses WHERE username = ? AND fingerprint = ? LIMIT 1"
+
+
+def fingerprint(username, expense_date, category, amount, note, payment_method):
+    # expense_date must already be ISO text
+    note = " ".join((note or "").split()).casefold()
+    key = "\x1f".join((username, expense_date, category, str(round(amount * 100)), note, payment_method or ""))
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def register(conn):
+    # Makes fingerprint() callable from SQL, for backfills
+    conn.create_function("fingerprint", 6, fingerprint, deterministic=True)
+
+
+def backfill(conn):
+    # Runs inside the caller's transaction
+    register(conn)
+    conn.execute("""UPDATE expenses SET fingerprint = fingerprint(username, date, category, amount, note, payment_method)
+                    WHERE fingerprint IS NULL""")
+
+
+def is_duplicate(conn, username, fp):
+    return conn.execute(DUPLICATE_SQL, (username, fp)).fetchone() is not None
+
+
+def existing_counts(conn, username, fingerprints):
+    # fingerprint -> rows already stored, for a batch of fingerprints
+    rows = conn.execute(
+        """SELECT fingerprint, COUNT(*) FROM expenses
+           WHERE username = ? AND fingerprint IN (SELECT value FROM json_each(?)) GROUP BY fingerprint""",
+        (username, "[" + ",".join(map(str, set(fingerprints))) + "]"),
+    )
+    return Counter(dict(rows.fetchall()))
+
+
+def scan(conn, username=None):
+    # Yields (username, fingerprint, copies, ids oldest first) per group of
+    # identical expenses, streamed from the index
+    where, params = ("AND username = ?", (username,)) if username is not None else ("", ())
+    cursor = conn.execute(
+        f"""SELECT username, fingerprint, COUNT(*), group_concat(id) FROM expenses
+            WHERE fingerprint IS NOT NULL {where}
+            GROUP BY username, fingerprint HAVING COUNT(*) > 1""",
+        params,
+    )
+    for user, fp, copies, ids in cursor:
+        yield user, fp, copies, sorted(int(i) for i in ids.split(","))
+
+
+def merge(conn, username=None):
+    # Deletes every copy but the oldest of each duplicate group, backing the
+    # deleted rows out of the derived tables; returns the number deleted
+    extra_ids = [i for _, _, _, ids in scan(conn, username) for i in ids[1:]]
+    users = set()
+    with conn:
+        for start in range(0, len(extra_ids), 500):
+            batch = extra_ids[start:start + 500]
+            rows = conn.execute(
+                f"""SELECT username, date, category, payment_method, amount FROM expenses
+                    WHERE id IN ({', '.join('?' * len(batch))})""",
+                batch,
+            ).fetchall()
+            conn.execute(f"DELETE FROM expenses WHERE id IN ({', '.join('?' * len(batch))})", batch)
+            for user, expense_date, category, payment_method, amount in rows:
+                rollups.apply(conn, user, expense_date, category, payment_method, -amount, -1)
+                budget_counters.apply(conn, user, expense_date[:7], -amount, -1)
+                snapshots.invalidate(conn, user, expense_date)
+                users.add(user)
+        for user in users:
+            versions.bump(conn, user)
+    for user in users:
+        expense_cache.bump(user)
+    return len(extra_ids)
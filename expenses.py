@@ -0,0 +1,38 @@
+import budget_counters
+import dedupe
+import rollups
+import snapshots
+import versions
+from cache import expense_cache
+from dates import to_iso
+
+# ------------------ Expense Writes ------------------
+# The single-expense write path, kept free of pandas so that the storage
+# backend and the group-commit writer load without it.
+
+INSERT_EXPENSE = """INSERT INTO expenses (username, date, category, amount, note, payment_method, fingerprint)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+def insert_expense(conn, username, expense_date, category, amount, note, payment_method, allow_duplicate=True):
+    # Runs inside the caller's transaction; returns the new expense id, or
+    # None when allow_duplicate is off and an identical expense exists
+    expense_date = to_iso(expense_date)
+    fp = dedupe.fingerprint(username, expense_date, category, amount, note, payment_method)
+    if not allow_duplicate and dedupe.is_duplicate(conn, username, fp):
+        return None
+    cursor = conn.execute(INSERT_EXPENSE, (username, expense_date, category, amount, note, payment_method, fp))
+    rollups.apply(conn, username, expense_date, category, payment_method, amount)
+    budget_counters.apply(conn, username, expense_date[:7], amount)
+    snapshots.invalidate(conn, username, expense_date)
+    versions.bump(conn, username)
+    return cursor.lastrowid
+
+
+def add_expense(conn, username, expense_date, category, amount, note, payment_method, allow_duplicate=True):
+    with conn:
+        expense_id = insert_expense(conn, username, expense_date, category, amount, note, payment_method,
+                                    allow_duplicate)
+    if expense_id is not None:
+        expense_cache.bump(username)
+    return expense_id
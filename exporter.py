@@ -0,0 +1,89 @@
+import csv
+import gzip
+import io
+import tempfile
+
+import queries
+
+# ------------------ Streaming Export ------------------
+# Exports are only built when the user asks for one. Rows are streamed from a
+# database cursor in chunks into a temporary file, so neither the query nor
+# the encoder ever holds the full history in memory.
+
+CHUNK_SIZE = 10000
+COLUMNS = ["date", "category", "amount", "payment_method", "note"]
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_formats():
+    return [name for name in FORMATS if name != "Parquet" or parquet_available()]
+
+
+def iter_chunks(cursor, chunk_size=CHUNK_SIZE):
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def write_csv(cursor, out, compress=False, chunk_size=CHUNK_SIZE):
+    binary = gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) if compress else out
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(COLUMNS)
+    for rows in iter_chunks(cursor, chunk_size):
+        writer.writerows(rows)
+    text.flush()
+    text.detach()
+    if compress:
+        binary.close()
+
+
+def write_parquet(cursor, out, chunk_size=CHUNK_SIZE):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("date", pa.string()),
+        ("category", pa.string()),
+        ("amount", pa.float64()),
+        ("payment_method", pa.string()),
+        ("note", pa.string()),
+    ])
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for rows in iter_chunks(cursor, chunk_size):
+            columns = list(zip(*rows))
+            writer.write_table(pa.table(dict(zip(COLUMNS, columns)), schema=schema))
+
+
+def export(conn, username, fmt, start=None, end=None, categories=None):
+    # Returns a temporary file positioned at the start of the export
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    cursor = queries.expense_cursor(conn, username, start, end, categories)
+    out = tempfile.TemporaryFile()
+    try:
+        if fmt == "Parquet":
+            write_parquet(cursor, out)
+        else:
+            write_csv(cursor, out, compress=fmt == "CSV (gzip)")
+    except Exception:
+        out.close()
+        raise
+    finally:
+        cursor.close()
+    out.seek(0)
+    return out
@@ -0,0 +1,56 @@
+import streamlit as st
+
+# ------------------ Display Formatting ------------------
+# Tables keep amounts and dates typed and let the browser format them through
+# column configuration, instead of turning every row into a string in Python.
+# Scalars shown in metrics and messages go through currency().
+
+CURRENCY = "₹"
+
+EXPENSE_COLUMNS = {
+    "id": None,
+    "date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
+    "category": st.column_config.TextColumn("Category"),
+    "amount": st.column_config.NumberColumn(f"Amount ({CURRENCY})", format="accounting"),
+    "payment_method": st.column_config.TextColumn("Payment Method"),
+    "note": st.column_config.TextColumn("Note"),
+}
+
+EXPENSE_TABLE_COLUMNS = ["date", "category", "amount", "payment_method", "note"]
+
+SUMMARY_COLUMNS = {
+    "category": st.column_config.TextColumn("Category"),
+    "amount": st.column_config.NumberColumn(f"Total Spent ({CURRENCY})", format="accounting"),
+    "average": st.column_config.NumberColumn(f"Average ({CURRENCY})", format="accounting"),
+    "count": st.column_config.NumberColumn("Transactions", format="localized"),
+}
+
+TIMING_COLUMNS = {
+    "name": st.column_config.TextColumn("Name", width="large"),
+    "count": st.column_config.NumberColumn("Calls", format="localized"),
+    "mean_ms": st.column_config.NumberColumn("Mean (ms)", format="%.2f"),
+    "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.2f"),
+    "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.2f"),
+    "max_ms": st.column_config.NumberColumn("Max (ms)", format="%.2f"),
+    "total_ms": st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+    "rows": st.column_config.NumberColumn("Rows", format="localized"),
+}
+
+
+def currency(amount):
+    return f"{CURRENCY} {amount:,.2f}"
+
+
+def expense_table(df, columns=EXPENSE_TABLE_COLUMNS):
+    st.dataframe(df, column_order=columns, column_config=EXPENSE_COLUMNS,
+                 use_container_width=True, hide_index=True)
+
+
+def summary_table(df):
+    st.dataframe(df, column_order=list(SUMMARY_COLUMNS), column_config=SUMMARY_COLUMNS,
+                 use_container_width=True, hide_index=True)
+
+
+def timing_table(df):
+    st.dataframe(df, column_order=list(TIMING_COLUMNS), column_config=TIMING_COLUMNS,
+                 use_container_width=True, hide_index=True)
@@ -0,0 +1,42 @@
+import sys
+
+import pandas as pd
+
+# ------------------ Compact Expense Frames ------------------
+# Expense rows are loaded into the smallest practical pandas representation,
+# since cached frames are multiplied across every logged-in session:
+#   - category and payment_method are categoricals (one small code per row)
+#   - amounts are integer paise, rounded in SQL
+#   - dates are datetime64 built from integer day numbers, not parsed strings
+#   - username is implied by the query and notes are fetched separately,
+#     only for rows that are actually displayed
+
+ROW_COLUMNS = """id,
+    CAST(julianday(date) - 2440587.5 AS INTEGER) AS day,
+    category,
+    CAST(ROUND(amount * 100) AS INTEGER) AS amount_paise,
+    payment_method"""
+
+_DTYPES = {"id": "int64", "day": "int32", "amount_paise": "int64",
+           "category": "category", "payment_method": "category"}
+
+
+def read_expenses(conn, sql, params):
+    # `sql` must select ROW_COLUMNS; extra columns are passed through
+    df = pd.read_sql_query(sql, conn, params=params, dtype=_DTYPES)
+    df.insert(1, "date", pd.to_datetime(df.pop("day"), unit="D"))
+    return df
+
+
+def rupees(df):
+    return df["amount_paise"] / 100
+
+
+def memory_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(memory_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(memory_bytes(v) for v in value.values())
+    return sys.getsizeof(value)
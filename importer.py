@@ -0,0 +1,259 @@
+import argparse
+import csv
+import io
+import sys
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import budget_counters
+import db
+import dedupe
+import rollups
+import search
+import snapshots
+import storage
+import versions
+from cache import expense_cache
+from dates import parse_date
+from expenses import INSERT_EXPENSE
+from queries import CATEGORIES, PAYMENT_METHODS
+
+# ------------------ Bulk CSV Import ------------------
+# Streams a CSV of expenses in chunks. Each chunk is validated, inserted with
+# executemany and folded into monthly_rollup inside one short transaction,
+# so a large bank export never sits in memory and never holds the write lock
+# for long. Expected columns (case-insensitive): Date, Category, Amount and
+# optionally Note and Payment Method. Rows the database already holds are
+# skipped by fingerprint (see dedupe.py) unless duplicates are kept.
+
+CHUNK_SIZE = 20000
+IMPORT_CACHE_KIB = 65536
+MAX_REJECTED_KEPT = 1000
+
+_CATEGORY_LOOKUP = {name.lower(): name for name in CATEGORIES}
+_PAYMENT_LOOKUP = {name.lower(): name for name in PAYMENT_METHODS}
+_COLUMN_ALIASES = {"payment method": "payment_method", "payment": "payment_method", "description": "note"}
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.rejected_count = 0
+        self.rejected = []  # (line number, reason, raw row), capped at MAX_REJECTED_KEPT
+        self.duplicates = 0
+        self.seconds = 0.0
+
+    def reject(self, line, reason, row):
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REJECTED_KEPT:
+            self.rejected.append((line, reason, row))
+
+
+def parse_amount(value):
+    cleaned = value.replace("₹", "").replace("Rs.", "").replace(",", "").strip()
+    amount = float(cleaned)
+    if not amount > 0:
+        raise ValueError(f"amount must be positive, got {value!r}")
+    return round(amount, 2)
+
+
+@lru_cache(maxsize=1024)
+def normalize_category(value):
+    value = value.strip()
+    if not value:
+        raise ValueError("missing category")
+    return _CATEGORY_LOOKUP.get(value.lower(), value.title())
+
+
+@lru_cache(maxsize=1024)
+def normalize_payment_method(value):
+    value = value.strip()
+    return _PAYMENT_LOOKUP.get(value.lower(), value) if value else "Cash"
+
+
+def _column_positions(header):
+    positions = {}
+    for index, name in enumerate(header or []):
+        key = (name or "").strip().lower()
+        positions.setdefault(_COLUMN_ALIASES.get(key, key.replace(" ", "_")), index)
+    missing = {"date", "category", "amount"} - set(positions)
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
+    return positions
+
+
+def row_normalizer(header):
+    # Returns a function mapping one CSV row to
+    # (date, category, amount, note, payment_method), raising ValueError
+    positions = _column_positions(header)
+    date_at, category_at, amount_at = positions["date"], positions["category"], positions["amount"]
+    note_at, payment_at = positions.get("note"), positions.get("payment_method")
+    width = max(positions.values()) + 1
+
+    def normalize(values):
+        if len(values) < width:
+            values = values + [""] * (width - len(values))
+        return (
+            parse_date(values[date_at]),
+            normalize_category(values[category_at]),
+            parse_amount(values[amount_at]),
+            values[note_at].strip() if note_at is not None else "",
+            normalize_payment_method(values[payment_at] if payment_at is not None else ""),
+        )
+    return normalize
+
+
+class DuplicateFilter:
+    # Drops rows already stored before the import began. Repeats are counted,
+    # so a row appearing three times in the file and once in the database
+    # imports twice, and the file's own repeats import on the first run.
+    def __init__(self):
+        self.seen = Counter()
+        self.inserted = Counter()
+
+    def filter(self, conn, username, rows):
+        # rows end with their fingerprint
+        existing = dedupe.existing_counts(conn, username, [row[-1] for row in rows])
+        stored_before = {fp: count - self.inserted[fp] for fp, count in existing.items()}
+        kept = []
+        for row in rows:
+            fp = row[-1]
+            self.seen[fp] += 1
+            if self.seen[fp] <= stored_before.get(fp, 0):
+                continue
+            self.inserted[fp] += 1
+            kept.append(row)
+        return kept
+
+
+def _write_chunk(conn, username, rows):
+    deltas = defaultdict(lambda: [0.0, 0])
+    for expense_date, category, amount, _, payment_method, _ in rows:
+        delta = deltas[(expense_date[:7], category, payment_method)]
+        delta[0] += amount
+        delta[1] += 1
+    # Taken up front so the notes index trigger is swapped out under the write lock
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        with search.deferred_indexing(conn):
+            conn.executemany(
+                INSERT_EXPENSE,
+                ((username, d, cat, amt, note, pm, fp) for d, cat, amt, note, pm, fp in rows),
+            )
+        rollups.apply_many(conn, ((username, month, cat, pm, total, count)
+                                  for (month, cat, pm), (total, count) in deltas.items()))
+        current = budget_counters.current_month()
+        month_deltas = [delta for (month, _, _), delta in deltas.items() if month == current]
+        if month_deltas:
+            budget_counters.apply(conn, username, current, sum(total for total, _ in month_deltas),
+                                  sum(count for _, count in month_deltas))
+        snapshots.invalidate_many(conn, username, {month for month, _, _ in deltas})
+        versions.bump(conn, username)
+
+
+def _records(reader, result):
+    # Lines the csv module cannot parse (an oversized field, or bad quoting in
+    # a strict dialect) are rejected like invalid rows; the reader carries on
+    # with the next line
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            result.reject(reader.line_num, str(e), [])
+            continue
+        yield values
+
+
+def import_rows(conn, username, text_stream, chunk_size=CHUNK_SIZE, progress=None, skip_duplicates=True):
+    # progress(rows_read, rows_imported) is called after every chunk
+    started = time.perf_counter()
+    result = ImportResult()
+    duplicates = DuplicateFilter() if skip_duplicates else None
+
+    def write(chunk):
+        if duplicates is not None:
+            kept = duplicates.filter(conn, username, chunk)
+            result.duplicates += len(chunk) - len(kept)
+            chunk = kept
+        if chunk:
+            _write_chunk(conn, username, chunk)
+            result.imported += len(chunk)
+
+    reader = csv.reader(text_stream)
+    try:
+        header = next(reader, None)
+    except csv.Error as e:
+        raise ValueError(f"unreadable CSV header: {e}") from None
+    normalize = row_normalizer(header)
+    # A larger page cache keeps the expense indexes in memory while they grow
+    previous_cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute(f"PRAGMA cache_size=-{IMPORT_CACHE_KIB}")
+    try:
+        chunk = []
+        line = 1
+        for values in _records(reader, result):
+            line = reader.line_num
+            if not any(values):
+                continue
+            try:
+                row = normalize(values)
+            except ValueError as e:
+                result.reject(line, str(e), values)
+                continue
+            chunk.append(row + (dedupe.fingerprint(username, *row),))
+            if len(chunk) >= chunk_size:
+                write(chunk)
+                chunk = []
+                if progress:
+                    progress(line - 1, result.imported)
+        if chunk:
+            write(chunk)
+        if progress:
+            progress(line - 1, result.imported)
+    finally:
+        conn.execute(f"PRAGMA cache_size={previous_cache_size}")
+        if result.imported:
+            expense_cache.bump(username)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_file(conn, username, uploaded, chunk_size=CHUNK_SIZE, progress=None, skip_duplicates=True):
+    # Accepts a binary file object such as a Streamlit UploadedFile
+    text = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+    try:
+        return import_rows(conn, username, text, chunk_size, progress, skip_duplicates)
+    finally:
+        text.detach()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import expenses from a CSV file.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--user", required=True, help="username that will own the imported expenses")
+    parser.add_argument("--db", help="database file; defaults to the user's database in the configured backend")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--keep-duplicates", action="store_true", help="also import rows the database already has")
+    args = parser.parse_args(argv)
+
+    def report(read, imported):
+        print(f"\r{read:,} rows read, {imported:,} imported", end="", file=sys.stderr)
+
+    with db.connection(args.db) if args.db else storage.get_backend().connection(args.user) as conn:
+        if not conn.execute("SELECT 1 FROM users WHERE username = ?", (args.user,)).fetchone():
+            parser.error(f"unknown user {args.user!r}")
+        with open(args.csv_path, encoding="utf-8-sig", newline="") as f:
+            result = import_rows(conn, args.user, f, args.chunk_size, report, not args.keep_duplicates)
+    print(file=sys.stderr)
+    print(f"Imported {result.imported:,} expenses in {result.seconds:.2f}s, rejected {result.rejected_count:,}, "
+          f"skipped {result.duplicates:,} duplicates")
+    for line, reason, _ in result.rejected[:20]:
+        print(f"  line {line}: {reason}")
+    return 0 if result.imported or not result.rejected_count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import bisect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# ------------------ Instrumentation ------------------
+# Opt-in timing of page sections, charts, cached queries and every SQL
+# statement, collected into in-process histograms. Set EXPENSE_METRICS=1 to
+# enable it and EXPENSE_METRICS_LOG=path to also append one JSON line per
+# rerun. When disabled, timer() hands back a shared no-op context manager and
+# connections are opened without the instrumented factory.
+
+ENABLED = os.environ.get("EXPENSE_METRICS", "").lower() in ("1", "true", "yes")
+LOG_PATH = os.environ.get("EXPENSE_METRICS_LOG") or None
+ADMIN_USERS = {name.strip() for name in os.environ.get("EXPENSE_ADMINS", "").split(",") if name.strip()}
+
+# Upper bounds of the latency buckets in milliseconds
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf")]
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_histograms = {}
+_local = threading.local()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def observe(self, ms, rows=0):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the given fraction of observations
+        target = fraction * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "total_ms": self.total_ms,
+            "rows": self.rows,
+        }
+
+
+def record(name, ms, rows=0):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(ms, rows)
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None:
+        rerun["events"].append((name, round(ms, 3), rows))
+
+
+@contextmanager
+def _timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - started) * 1000)
+
+
+def timer(name):
+    return _timed(name) if ENABLED else _NULL
+
+
+def snapshot():
+    with _lock:
+        return {name: h.summary() for name, h in sorted(_histograms.items())}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def is_admin(username):
+    return username in ADMIN_USERS
+
+
+# ------------------ Per-Rerun Records ------------------
+def begin_rerun(page, username):
+    if ENABLED:
+        _local.rerun = {"page": page, "user": username, "started": time.perf_counter(), "events": []}
+
+
+def end_rerun(cache_stats=None):
+    # cache_stats is a callable, only invoked when a record is written
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return
+    _local.rerun = None
+    elapsed = (time.perf_counter() - rerun["started"]) * 1000
+    record(f"rerun:{rerun['page']}", elapsed)
+    if LOG_PATH:
+        sql = [e for e in rerun["events"] if e[0].startswith("sql:")]
+        line = {
+            "ts": time.time(),
+            "page": rerun["page"],
+            "user": rerun["user"],
+            "total_ms": round(elapsed, 3),
+            "sections": {name: ms for name, ms, _ in rerun["events"] if not name.startswith("sql:")},
+            "sql_statements": len(sql),
+            "sql_ms": round(sum(e[1] for e in sql), 3),
+            "sql_rows": sum(e[2] for e in sql),
+            "cache": cache_stats() if cache_stats else None,
+        }
+        with _lock, open(LOG_PATH, "a") as f:
+            f.write(json.dumps(line) + "\n")
+
+
+# ------------------ SQL Timing ------------------
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_name(sql):
+    return "sql:" + _WHITESPACE.sub(" ", sql).strip()[:120]
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    # execute() time covers preparing and stepping to the first row; fetch
+    # time and row counts are added when the results are read
+    _name = None
+
+    def execute(self, sql, parameters=()):
+        self._name = statement_name(sql)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record(self._name, (time.perf_counter() - started) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._name = statement_name(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record(self._name, (time.perf_counter() - started) * 1000, max(self.rowcount, 0))
+
+    def _fetched(self, started, rows):
+        if self._name:
+            record(self._name + " [fetch]", (time.perf_counter() - started) * 1000, rows)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, int(row is not None))
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    # Connection.execute() and executemany() run on a plain C-level cursor,
+    # so they are routed through cursor() to be timed like everything else
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory():
+    return InstrumentedConnection if ENABLED else sqlite3.Connection
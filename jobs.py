@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+
+import alerts
+import archive
+import budget_counters
+import db
+import snapshots
+
+# ------------------ Background Jobs ------------------
+# Periodic maintenance that runs on one daemon thread in the app process,
+# every JOB_INTERVAL seconds (0 turns it off). Each job takes the storage
+# backend and visits every database in it; `python maintenance.py` runs any
+# of them on demand instead, e.g. from cron.
+
+JOB_INTERVAL = int(os.environ.get("EXPENSE_JOB_INTERVAL", "3600"))
+
+JOBS = [
+    ("report snapshots", snapshots.build_all),
+    ("budget counter reconcile", budget_counters.reconcile_all),
+    ("budget alerts", alerts.evaluate_all),
+    ("query planner statistics", db.optimize_all),
+]
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def run_all(backend):
+    archive.refresh()
+    for name, job in JOBS:
+        try:
+            job(backend)
+        except Exception as e:
+            print(f"Background job {name!r} failed: {e}", file=sys.stderr)
+
+
+def _run_forever(backend, interval, stop):
+    while not stop.wait(interval):
+        run_all(backend)
+
+
+def start(backend, interval=JOB_INTERVAL):
+    # Starts the thread once per process; the first run comes after one
+    # interval so it never competes with server startup
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None and interval > 0:
+            stop = threading.Event()
+            thread = threading.Thread(target=_run_forever, args=(backend, interval, stop),
+                                      name="background jobs", daemon=True)
+            thread.start()
+            _scheduler = (thread, stop)
+
+
+def stop():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler[1].set()
+            _scheduler = None
@@ -0,0 +1,134 @@
+import argparse
+import sys
+import time
+
+import alerts
+import archive
+import budget_counters
+import dedupe
+import rollups
+import snapshots
+import storage
+import versions
+from cache import expense_cache
+
+# ------------------ Maintenance Commands ------------------
+# Command line entry points for the maintenance jobs, for running them on
+# demand or from cron. Each command visits every database in the configured
+# backend, or just the file given with --db:
+#   python maintenance.py snapshots [--user NAME]
+#   python maintenance.py reconcile
+#   python maintenance.py alerts
+#   python maintenance.py archive [--before YEAR] [--vacuum]
+#   python maintenance.py dedupe [--user NAME] [--merge]
+#   python maintenance.py rollups [--user NAME]
+
+
+def build_snapshots(backend, args):
+    print(f"Built {snapshots.build_all(backend, args.user)} report snapshots")
+
+
+def reconcile_counters(backend, args):
+    drifted = budget_counters.reconcile_all(backend)
+    for username, stored, actual in drifted:
+        print(f"{username}: counter {stored:.2f}, expenses {actual:.2f}; repaired")
+    print(f"Reconciled budget counters: {len(drifted)} repaired")
+
+
+def evaluate_alerts(backend, args):
+    started = time.perf_counter()
+    count = alerts.evaluate_all(backend)
+    print(f"{count} budget alerts in {time.perf_counter() - started:.2f}s")
+
+
+def archive_years(backend, args):
+    for path, years in archive.archive_all(backend, args.before, args.vacuum).items():
+        for year, rows in years.items():
+            print(f"{path}: archived {rows} expenses from {year} to {archive.archive_path(path, year)}")
+        if not years:
+            print(f"{path}: nothing to archive")
+
+
+def find_duplicates(backend, args):
+    groups = extra = 0
+    for pool in backend.pools():
+        with pool.connection() as conn:
+            for user, _, copies, ids in dedupe.scan(conn, args.user):
+                groups += 1
+                extra += copies - 1
+                if groups <= 50:
+                    print(f"{user}: {copies} copies, ids {', '.join(map(str, ids))}")
+            if args.merge:
+                dedupe.merge(conn, args.user)
+    print(f"{groups:,} duplicate groups, {extra:,} extra copies" + (" removed" if args.merge else ""))
+
+
+def _rollup_users(conn, username):
+    if username:
+        return {username}
+    return {row[0] for row in conn.execute("SELECT DISTINCT username FROM monthly_rollup")}
+
+
+def rebuild_rollups(backend, args):
+    for pool in backend.pools():
+        with pool.connection() as conn:
+            # Archived years still count; their archives are attached first
+            source = archive.source(conn)
+            with conn:
+                users = _rollup_users(conn, args.user)
+                rollups.rebuild(conn, args.user, source)
+                users |= _rollup_users(conn, args.user)
+                # Snapshots and counters were derived from the old rollups
+                snapshots.clear(conn, args.user)
+                budget_counters.rebuild(conn, args.user)
+                for user in users:
+                    versions.bump(conn, user)
+            for user in users:
+                expense_cache.bump(user)
+            rows = conn.execute("SELECT COUNT(*) FROM monthly_rollup").fetchone()[0]
+        print(f"{pool.path}: rebuilt monthly_rollup, {rows} rows")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run maintenance jobs over the expense databases.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", help="database file; defaults to every database in the configured backend")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("snapshots", parents=[common],
+                                  help="materialize report snapshots for closed months and years")
+    command.add_argument("--user", help="only build this user's snapshots")
+    command.set_defaults(run=build_snapshots)
+
+    command = commands.add_parser("reconcile", parents=[common],
+                                  help="check budget counters against the expenses and repair drift")
+    command.set_defaults(run=reconcile_counters)
+
+    command = commands.add_parser("alerts", parents=[common],
+                                  help="evaluate every user's month-to-date spend against their budget")
+    command.set_defaults(run=evaluate_alerts)
+
+    command = commands.add_parser("archive", parents=[common],
+                                  help="move closed years of expenses into per-year archive databases")
+    command.add_argument("--before", type=int, help="archive years before this one (default: the current year)")
+    command.add_argument("--vacuum", action="store_true", help="shrink the hot database file afterwards")
+    command.set_defaults(run=archive_years)
+
+    command = commands.add_parser("dedupe", parents=[common], help="find expenses recorded more than once")
+    command.add_argument("--user", help="only check this user's expenses")
+    command.add_argument("--merge", action="store_true", help="delete all but the oldest copy of each duplicate")
+    command.set_defaults(run=find_duplicates)
+
+    command = commands.add_parser("rollups", parents=[common],
+                                  help="rebuild monthly_rollup from the expenses, archived years included")
+    command.add_argument("--user", help="only rebuild this user's rows")
+    command.set_defaults(run=rebuild_rollups)
+
+    args = parser.parse_args(argv)
+    backend = storage.SQLiteBackend(args.db) if args.db else storage.get_backend()
+    args.run(backend, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import sqlite3
+import sys
+
+import budget_counters
+import dedupe
+import rollups
+import search
+from dates import parse_date
+
+# ------------------ Schema Migrations ------------------
+# Each migration runs exactly once, in order, inside its own transaction. The
+# applied version is recorded in schema_version. Migrations must tolerate
+# databases created before this table existed, where some columns were
+# already added by the old ALTER TABLE startup checks. Tables are defined in
+# the migration that creates them, apart from the notes index, which
+# search.py can also recreate on its own.
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn, table, column, definition):
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def create_base_tables(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        date TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        note TEXT,
+        payment_method TEXT,
+        FOREIGN KEY(username) REFERENCES users(username)
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS budgets (
+        username TEXT PRIMARY KEY,
+        monthly_budget REAL NOT NULL,
+        FOREIGN KEY(username) REFERENCES users(username)
+    )''')
+
+
+def add_users_created_at(conn):
+    _add_column(conn, "users", "created_at", "TEXT DEFAULT '2024-01-01'")
+
+
+def add_expenses_payment_method(conn):
+    _add_column(conn, "expenses", "payment_method", "TEXT DEFAULT 'Cash'")
+
+
+def add_expense_indexes(conn):
+    # Every page filters by user and date range; category reports add category
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses (username, date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_category_date ON expenses (username, category, date)")
+    conn.execute("ANALYZE expenses")
+
+
+def add_expense_amount_index(conn):
+    # Lets the expense history page sort and paginate by amount
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_amount ON expenses (username, amount)")
+
+
+def add_monthly_rollup(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS monthly_rollup (
+        username TEXT NOT NULL,
+        month TEXT NOT NULL,
+        category TEXT NOT NULL,
+        payment_method TEXT NOT NULL DEFAULT '',
+        total REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (username, month, category, payment_method)
+    ) WITHOUT ROWID''')
+    rollups.rebuild(conn)
+
+
+def store_iso_dates(conn):
+    # Rewrite legacy date values as ISO text, then rebuild expenses with a
+    # CHECK constraint so only canonical dates can be stored from now on
+    # date(x, '+0 days') normalises impossible days such as Feb 30, so a value
+    # is canonical only if it survives the round trip unchanged
+    legacy = conn.execute("SELECT id, date FROM expenses WHERE date IS NOT date(date, '+0 days')").fetchall()
+    for expense_id, value in legacy:
+        try:
+            iso = parse_date(str(value))
+        except ValueError:
+            raise RuntimeError(f"Expense {expense_id} has an unreadable date {value!r}; fix it and restart") from None
+        conn.execute("UPDATE expenses SET date = ? WHERE id = ?", (iso, expense_id))
+    conn.execute('''CREATE TABLE expenses_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        date TEXT NOT NULL CHECK (date IS date(date, '+0 days')),
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        note TEXT,
+        payment_method TEXT DEFAULT 'Cash',
+        FOREIGN KEY(username) REFERENCES users(username)
+    )''')
+    conn.execute("""INSERT INTO expenses_new (id, username, date, category, amount, note, payment_method)
+                    SELECT id, username, date, category, amount, note, payment_method FROM expenses""")
+    conn.execute("DROP TABLE expenses")
+    conn.execute("ALTER TABLE expenses_new RENAME TO expenses")
+    add_expense_indexes(conn)
+    add_expense_amount_index(conn)
+    if legacy:
+        rollups.rebuild(conn)
+
+
+def add_note_search(conn):
+    # Skipped on SQLite builds without FTS5; the search box is hidden there
+    if search.fts5_available(conn):
+        search.create(conn)
+        search.rebuild(conn)
+
+
+def add_report_snapshots(conn):
+    # Filled by the snapshot job
+    conn.execute('''CREATE TABLE IF NOT EXISTS report_snapshots (
+        username TEXT NOT NULL,
+        period TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        built_at TEXT NOT NULL DEFAULT (datetime('now')),
+        PRIMARY KEY (username, period)
+    ) WITHOUT ROWID''')
+
+
+def add_budget_counters(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS budget_counters (
+        username TEXT PRIMARY KEY,
+        month TEXT NOT NULL,
+        spent REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+    budget_counters.rebuild(conn)
+
+
+def add_budget_alerts(conn):
+    # Filled by the alert job
+    conn.execute('''CREATE TABLE IF NOT EXISTS budget_alerts (
+        username TEXT NOT NULL,
+        month TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        spent REAL NOT NULL,
+        budget REAL NOT NULL,
+        projected REAL NOT NULL,
+        seen INTEGER NOT NULL DEFAULT 0,
+        evaluated_at TEXT NOT NULL DEFAULT (datetime('now')),
+        PRIMARY KEY (username, month)
+    ) WITHOUT ROWID''')
+
+
+def add_data_versions(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS data_versions (
+        username TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+
+
+def add_archived_years(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS archived_years (
+        year INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )''')
+
+
+def add_expense_fingerprints(conn):
+    _add_column(conn, "expenses", "fingerprint", "INTEGER")
+    dedupe.backfill(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_fingerprint ON expenses (username, fingerprint)")
+
+
+def add_archived_user_years(conn):
+    # Filled by archive.archive_year(); `python maintenance.py archive` fills
+    # it for years archived before this table existed
+    conn.execute('''CREATE TABLE IF NOT EXISTS archived_user_years (
+        username TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        first_date TEXT NOT NULL,
+        last_date TEXT NOT NULL,
+        max_amount REAL NOT NULL,
+        PRIMARY KEY (username, year)
+    ) WITHOUT ROWID''')
+
+
+def add_expense_date_index(conn):
+    # The alert window and the counter reconcile cover every user over a few
+    # days, so they need an index that leads with the date and covers amount
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date_user_amount ON expenses (date, username, amount)")
+    conn.execute("ANALYZE expenses")
+
+
+MIGRATIONS = [
+    (1, "create base tables", create_base_tables),
+    (2, "add users.created_at", add_users_created_at),
+    (3, "add expenses.payment_method", add_expenses_payment_method),
+    (4, "index expenses by user, date and category", add_expense_indexes),
+    (5, "create and backfill monthly_rollup", add_monthly_rollup),
+    (6, "index expenses by user and amount", add_expense_amount_index),
+    (7, "store expense dates as checked ISO text", store_iso_dates),
+    (8, "index expense notes for full-text search", add_note_search),
+    (9, "create report_snapshots", add_report_snapshots),
+    (10, "create and backfill budget_counters", add_budget_counters),
+    (11, "create budget_alerts", add_budget_alerts),
+    (12, "create data_versions", add_data_versions),
+    (13, "create archived_years", add_archived_years),
+    (14, "fingerprint and index expenses for duplicate detection", add_expense_fingerprints),
+    (15, "create archived_user_years", add_archived_user_years),
+    (16, "index expenses by date for cross-user scans", add_expense_date_index),
+]
+
+
+def current_version(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )''')
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn):
+    applied = []
+    version = current_version(conn)
+    for number, description, apply in MIGRATIONS:
+        if number <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have applied it while we waited for the lock
+        if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (number,)).fetchone():
+            conn.rollback()
+            continue
+        try:
+            apply(conn)
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)", (number, description))
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        applied.append(number)
+    return applied
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "database.db"
+    with sqlite3.connect(path) as db:
+        for number in migrate(db):
+            print(f"Applied migration {number}")
+        print(f"Schema version: {current_version(db)}")
@@ -0,0 +1,321 @@
+import calendar
+from datetime import date, timedelta
+
+import pandas as pd
+
+import archive
+import frames
+import search
+import snapshots
+from dates import to_iso
+
+# ------------------ Query Layer ------------------
+# Every page asks SQLite for the aggregates and rows it displays instead of
+# loading the whole expense history into pandas. Date bounds are inclusive and
+# may be datetime.date objects or ISO "YYYY-MM-DD" strings; stored dates are
+# always ISO, so bounds compare directly against the (username, date) index.
+# Row reads go through archive.source(), which adds archived years only when
+# the date range reaches them.
+
+CATEGORIES = ["Food", "Transport", "Bills", "Shopping", "Entertainment", "Health", "Education", "Other"]
+PAYMENT_METHODS = ["Cash", "Credit Card", "Debit Card", "UPI", "Net Banking"]
+SORTS = {
+    "Newest first": ("date", "DESC"),
+    "Oldest first": ("date", "ASC"),
+    "Highest amount": ("amount", "DESC"),
+    "Lowest amount": ("amount", "ASC"),
+}
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _where(username, start=None, end=None, categories=None):
+    clauses = ["username = ?"]
+    params = [username]
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(to_iso(start))
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(to_iso(end))
+    if categories is not None:
+        categories = list(categories)
+        if not categories:
+            clauses.append("0")
+        else:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+    return " AND ".join(clauses), params
+
+
+def month_bounds(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+# ------------------ Scalar Aggregates ------------------
+def has_expenses(conn, username):
+    row = conn.execute("SELECT 1 FROM monthly_rollup WHERE username = ? AND count > 0 LIMIT 1", (username,)).fetchone()
+    return row is not None
+
+
+def totals(conn, username, start=None, end=None, categories=None):
+    where, params = _where(username, start, end, categories)
+    row = conn.execute(
+        f"SELECT COALESCE(SUM(amount), 0), COUNT(*), COALESCE(AVG(amount), 0), COALESCE(MAX(amount), 0), "
+        f"MAX(date) FROM {archive.source(conn, start, end)} WHERE {where}",
+        params,
+    ).fetchone()
+    return {"total": row[0], "count": row[1], "average": row[2], "max": row[3], "last_date": row[4]}
+
+
+def spent_between(conn, username, start, end):
+    where, params = _where(username, start, end)
+    return conn.execute(f"SELECT COALESCE(SUM(amount), 0) FROM {archive.source(conn, start, end)} WHERE {where}",
+                        params).fetchone()[0]
+
+
+def dashboard_summary(conn, username, today=None):
+    # All-time figures come from monthly_rollup and the archive summaries, and
+    # the last 7 days from the hot rows, so no archive is opened; month-to-date
+    # spend comes from budget_counters
+    today = today or date.today()
+    overall = rollup_totals(conn, username)
+    return {
+        "total": overall["total"],
+        "week": spent_between(conn, username, today - timedelta(days=6), None),
+        "count": overall["count"],
+        "average": overall["total"] / overall["count"] if overall["count"] else 0,
+        "max": max_amount(conn, username),
+    }
+
+
+def max_amount(conn, username):
+    # The hot part is one seek on the (username, amount) index
+    hot = conn.execute("SELECT MAX(amount) FROM expenses WHERE username = ?", (username,)).fetchone()[0]
+    return max(hot or 0, archive.user_summary(conn, username)[2] or 0)
+
+
+def date_bounds(conn, username):
+    # Separate MIN and MAX subqueries are each one index seek
+    hot_first, hot_last = conn.execute(
+        """SELECT (SELECT MIN(date) FROM expenses WHERE username = ?),
+                  (SELECT MAX(date) FROM expenses WHERE username = ?)""",
+        (username, username),
+    ).fetchone()
+    archived_first, archived_last, _ = archive.user_summary(conn, username)
+    firsts = [d for d in (hot_first, archived_first) if d is not None]
+    if not firsts:
+        return None, None
+    lasts = [d for d in (hot_last, archived_last) if d is not None]
+    return date.fromisoformat(min(firsts)), date.fromisoformat(max(lasts))
+
+
+def filter_start(conn, username, first, last):
+    # Default start of the History and Analysis date filters, given the
+    # user's date_bounds: the first expense, or the first day after the
+    # archived years when the user has expenses since, so the default view
+    # never opens an archive
+    hot_start = archive.hot_start(conn)
+    if first is None or hot_start is None or first >= hot_start or last < hot_start:
+        return first
+    return hot_start
+
+
+def category_names(conn, username):
+    rows = conn.execute(
+        "SELECT DISTINCT category FROM monthly_rollup WHERE username = ? AND count > 0 ORDER BY category", (username,)
+    )
+    return [r[0] for r in rows]
+
+
+def years(conn, username):
+    rows = conn.execute(
+        "SELECT DISTINCT CAST(substr(month, 1, 4) AS INTEGER) AS year FROM monthly_rollup WHERE username = ? ORDER BY year DESC",
+        (username,),
+    )
+    return [r[0] for r in rows]
+
+
+# ------------------ Grouped Aggregates ------------------
+def category_totals(conn, username, start=None, end=None):
+    where, params = _where(username, start, end)
+    return pd.read_sql(
+        f"""SELECT category, SUM(amount) AS amount, ROUND(AVG(amount), 2) AS average, COUNT(*) AS count
+            FROM {archive.source(conn, start, end)} WHERE {where} GROUP BY category ORDER BY amount DESC""",
+        conn, params=params,
+    )
+
+
+# SQL expression giving the first day of each bucket, by trend resolution
+TREND_BUCKETS = {
+    "Day": "date",
+    "Week": "date(date, '-6 days', 'weekday 1')",
+    "Month": "substr(date, 1, 7) || '-01'",
+}
+
+
+def trend_totals(conn, username, start=None, end=None, resolution="Day"):
+    where, params = _where(username, start, end)
+    bucket = TREND_BUCKETS[resolution]
+    return pd.read_sql(
+        f"""SELECT {bucket} AS date, SUM(amount) AS amount
+            FROM {archive.source(conn, start, end)} WHERE {where} GROUP BY 1 ORDER BY 1""",
+        conn, params=params, parse_dates=["date"],
+    )
+
+
+def weekday_totals(conn, username, start=None, end=None):
+    where, params = _where(username, start, end)
+    rows = dict(conn.execute(
+        f"""SELECT CAST(strftime('%w', date) AS INTEGER), SUM(amount)
+            FROM {archive.source(conn, start, end)} WHERE {where} GROUP BY 1""",
+        params,
+    ).fetchall())
+    # SQLite numbers weekdays from Sunday = 0
+    amounts = [rows.get((i + 1) % 7) for i in range(7)]
+    return pd.DataFrame({"day_of_week": WEEKDAYS, "amount": amounts})
+
+
+def payment_totals(conn, username, start=None, end=None):
+    where, params = _where(username, start, end)
+    return pd.read_sql(
+        f"""SELECT payment_method, SUM(amount) AS amount FROM {archive.source(conn, start, end)}
+            WHERE {where} AND payment_method IS NOT NULL GROUP BY payment_method ORDER BY amount DESC""",
+        conn, params=params,
+    )
+
+
+# ------------------ Rollup Aggregates ------------------
+# Read from monthly_rollup, so date bounds are widened to whole months.
+def _month_where(username, start=None, end=None):
+    clauses = ["username = ?"]
+    params = [username]
+    if start is not None:
+        clauses.append("month >= ?")
+        params.append(to_iso(start)[:7])
+    if end is not None:
+        clauses.append("month <= ?")
+        params.append(to_iso(end)[:7])
+    return " AND ".join(clauses), params
+
+
+def rollup_totals(conn, username, start=None, end=None):
+    where, params = _month_where(username, start, end)
+    row = conn.execute(
+        f"SELECT COALESCE(SUM(total), 0), COALESCE(SUM(count), 0) FROM monthly_rollup WHERE {where}", params
+    ).fetchone()
+    return {"total": row[0], "count": row[1]}
+
+
+def monthly_totals(conn, username, start=None, end=None):
+    where, params = _month_where(username, start, end)
+    return pd.read_sql(
+        f"""SELECT month, SUM(total) AS amount, SUM(count) AS count
+            FROM monthly_rollup WHERE {where} GROUP BY month HAVING SUM(count) > 0 ORDER BY month""",
+        conn, params=params,
+    )
+
+
+def rollup_category_totals(conn, username, start=None, end=None):
+    where, params = _month_where(username, start, end)
+    return pd.read_sql(
+        f"""SELECT category, SUM(total) AS amount, ROUND(SUM(total) / SUM(count), 2) AS average, SUM(count) AS count
+            FROM monthly_rollup WHERE {where} GROUP BY category HAVING SUM(count) > 0 ORDER BY amount DESC""",
+        conn, params=params,
+    )
+
+
+def period_report(conn, username, period):
+    # Totals, categories and months of one month ("YYYY-MM") or year ("YYYY");
+    # closed periods are read from report_snapshots
+    return snapshots.report(conn, username, period)
+
+
+# ------------------ Row Queries ------------------
+# Row queries return compact frames (see frames.py); fetch notes for the rows
+# being displayed with expense_notes.
+def expenses(conn, username, start=None, end=None, categories=None, limit=None):
+    where, params = _where(username, start, end, categories)
+    sql = f"""SELECT {frames.ROW_COLUMNS} FROM {archive.source(conn, start, end)}
+              WHERE {where} ORDER BY date DESC, id DESC"""
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return frames.read_expenses(conn, sql, params)
+
+
+def expense_page(conn, username, start=None, end=None, categories=None, sort="Newest first", after=None,
+                 page_size=50):
+    # Keyset pagination: `after` is the (sort value, id) of the last row on the
+    # previous page, so every page is an index seek however deep it is.
+    # Returns the page and the cursor for the next one (None on the last page).
+    column, direction = SORTS[sort]
+    where, params = _where(username, start, end, categories)
+    if after is not None:
+        where += f" AND ({column}, id) {'<' if direction == 'DESC' else '>'} (?, ?)"
+        params.extend(after)
+    params.append(page_size + 1)
+    df = frames.read_expenses(
+        conn,
+        f"""SELECT {frames.ROW_COLUMNS}, {column} AS sort_key FROM {archive.source(conn, start, end)}
+            WHERE {where} ORDER BY {column} {direction}, id {direction} LIMIT ?""",
+        params,
+    )
+    # The cursor keeps the stored value, not the converted one, so the next
+    # seek compares exactly
+    sort_keys = df.pop("sort_key")
+    if len(df) <= page_size:
+        return df, None
+    df = df.head(page_size)
+    return df, (sort_keys.iloc[page_size - 1], int(df["id"].iloc[-1]))
+
+
+def note_search_available(conn, username):
+    return search.is_indexed(conn)
+
+
+def search_expenses(conn, username, text, start=None, end=None, categories=None, limit=200):
+    # Best bm25 matches first, newest first among equals; None when the text
+    # has no searchable words
+    expression = search.match_expression(text)
+    if expression is None:
+        return None
+    where, params = _where(username, start, end, categories)
+    return frames.read_expenses(
+        conn,
+        f"""SELECT {frames.ROW_COLUMNS} FROM notes_fts JOIN expenses ON expenses.id = notes_fts.rowid
+            WHERE notes_fts MATCH ? AND {where} ORDER BY notes_fts.rank, date DESC LIMIT ?""",
+        [expression] + params + [limit],
+    )
+
+
+def expense_notes(conn, username, ids, start=None, end=None):
+    # start and end span the rows' dates, so notes for recent rows never
+    # reach into the archives
+    if not ids:
+        return {}
+    rows = conn.execute(
+        f"""SELECT id, note FROM {archive.source(conn, start, end)}
+            WHERE username = ? AND id IN ({', '.join('?' * len(ids))})""",
+        [username, *ids],
+    )
+    return dict(rows.fetchall())
+
+
+def expense_cursor(conn, username, start=None, end=None, categories=None):
+    # Oldest first, for exports that stream rows with fetchmany
+    where, params = _where(username, start, end, categories)
+    return conn.execute(
+        f"""SELECT date, category, amount, payment_method, note FROM {archive.source(conn, start, end)}
+            WHERE {where} ORDER BY date, id""",
+        params,
+    )
+
+
+def recent_expenses(conn, username, limit=10):
+    # Read from the years still in the hot table unless the user has fewer
+    # than `limit` expenses there
+    hot_start = archive.hot_start(conn)
+    df = expenses(conn, username, start=hot_start, limit=limit)
+    if len(df) < limit and hot_start is not None:
+        df = expenses(conn, username, limit=limit)
+    return df
@@ -0,0 +1,37 @@
+# ------------------ Monthly Rollups ------------------
+# monthly_rollup keeps one row of (sum, count) per user, month, category and
+# payment method. Expense writes update it in the same transaction, so
+# monthly and yearly reports read O(months x categories) rows instead of
+# every transaction. Unknown payment methods are stored as ''. Rebuild it
+# with `python maintenance.py rollups`.
+
+APPLY_SQL = """INSERT INTO monthly_rollup (username, month, category, payment_method, total, count)
+               VALUES (?, substr(?, 1, 7), ?, COALESCE(?, ''), ?, ?)
+               ON CONFLICT (username, month, category, payment_method)
+               DO UPDATE SET total = total + excluded.total, count = count + excluded.count"""
+
+
+def apply(conn, username, expense_date, category, payment_method, amount, count=1):
+    # Pass a negative amount and count to back an expense out
+    conn.execute(APPLY_SQL, (username, expense_date, category, payment_method, amount, count))
+
+
+def apply_many(conn, deltas):
+    # deltas: (username, date, category, payment_method, amount, count) tuples
+    conn.executemany(APPLY_SQL, deltas)
+
+
+def rebuild(conn, username=None, source="expenses"):
+    # Runs inside the caller's transaction. Once years are archived, pass
+    # archive.source(conn), called before the transaction, or their months
+    # are lost
+    where, params = ("WHERE username = ?", (username,)) if username is not None else ("", ())
+    conn.execute(f"DELETE FROM monthly_rollup {where}", params)
+    conn.execute(
+        f"""INSERT INTO monthly_rollup (username, month, category, payment_method, total, count)
+            SELECT username, substr(date, 1, 7), category, COALESCE(payment_method, ''), SUM(amount), COUNT(*)
+            FROM {source} {where}
+            GROUP BY username, substr(date, 1, 7), category, COALESCE(payment_method, '')""",
+        params,
+    )
+
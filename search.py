@@ -0,0 +1,94 @@
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+# ------------------ Note Search ------------------
+# notes_fts is an external-content FTS5 index over expenses.note: it stores
+# only the inverted index and reads note text back from expenses by rowid.
+# Triggers on expenses keep it in sync, and the prefix indexes make
+# two- and three-letter prefix queries ("fl*") index lookups. Bulk imports
+# skip the per-row insert trigger and index each chunk with one statement
+# (see deferred_indexing).
+
+CREATE_TABLE = """CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    note,
+    content='expenses',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)"""
+
+TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS expenses_notes_ai AFTER INSERT ON expenses BEGIN
+           INSERT INTO notes_fts (rowid, note) VALUES (new.id, new.note);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_notes_ad AFTER DELETE ON expenses BEGIN
+           INSERT INTO notes_fts (notes_fts, rowid, note) VALUES ('delete', old.id, old.note);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_notes_au AFTER UPDATE OF note ON expenses BEGIN
+           INSERT INTO notes_fts (notes_fts, rowid, note) VALUES ('delete', old.id, old.note);
+           INSERT INTO notes_fts (rowid, note) VALUES (new.id, new.note);
+       END""",
+]
+
+_TERM = re.compile(r"\w+")
+
+
+def fts5_available(conn):
+    return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def create(conn):
+    conn.execute(CREATE_TABLE)
+    for trigger in TRIGGERS:
+        conn.execute(trigger)
+
+
+@contextmanager
+def deferred_indexing(conn):
+    # For bulk inserts inside an open write transaction: drops the insert
+    # trigger, then indexes every row added meanwhile with one INSERT ... SELECT
+    # and recreates the trigger before the caller commits, so other
+    # connections never see it missing. A rollback restores it too.
+    if not is_indexed(conn):
+        yield
+        return
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM expenses").fetchone()[0]
+    conn.execute("DROP TRIGGER IF EXISTS expenses_notes_ai")
+    yield
+    # AUTOINCREMENT ids only grow, and the write lock keeps other writers out
+    conn.execute("INSERT INTO notes_fts (rowid, note) SELECT id, note FROM expenses WHERE id > ?", (last_id,))
+    conn.execute(TRIGGERS[0])
+
+
+def rebuild(conn):
+    # Re-reads every note from expenses; runs inside the caller's transaction
+    conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+
+def is_indexed(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'notes_fts'").fetchone() is not None
+
+
+def match_expression(text):
+    # Every word must appear, the last one as a prefix so results narrow while
+    # typing; words are quoted so user input is never parsed as FTS5 syntax
+    terms = _TERM.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+if __name__ == "__main__":
+    # Usage: python search.py [database.db]
+    path = sys.argv[1] if len(sys.argv) > 1 else "database.db"
+    db = sqlite3.connect(path)
+    with db:
+        create(db)
+        rebuild(db)
+    rows = db.execute("SELECT COUNT(*) FROM expenses WHERE note IS NOT NULL AND note != ''").fetchone()[0]
+    print(f"Rebuilt notes_fts: {rows} notes indexed")
+    db.close()
@@ -0,0 +1,148 @@
+import json
+from datetime import date
+
+import archive
+
+# ------------------ Report Snapshots ------------------
+# Reports for closed periods (months before the current one, years before
+# the current one) are materialized as one JSON row per user and period in
+# report_snapshots. Expense writes delete the month and year snapshots they
+# touch in the same transaction that updates monthly_rollup, so a backdated
+# expense invalidates exactly the periods it lands in. build() fills in every
+# missing snapshot; it runs with the background jobs in the app (see jobs.py)
+# or from `python maintenance.py snapshots`. Snapshots are computed from monthly_rollup
+# inside a write transaction, so no expense can commit between reading and
+# storing. Readers never store: a closed period without a snapshot is
+# computed live until the next build.
+
+INVALIDATE_SQL = """DELETE FROM report_snapshots
+                    WHERE username = ? AND period IN (substr(?, 1, 7), substr(?, 1, 4))"""
+
+
+def invalidate(conn, username, expense_date):
+    # Runs inside the caller's transaction
+    conn.execute(INVALIDATE_SQL, (username, expense_date, expense_date))
+
+
+def invalidate_many(conn, username, months):
+    # months: "YYYY-MM" strings, e.g. the months of an imported chunk
+    conn.executemany(INVALIDATE_SQL, ((username, month, month) for month in months))
+
+
+def clear(conn, username=None):
+    # Runs inside the caller's transaction; for when monthly_rollup is rebuilt
+    where, params = ("WHERE username = ?", (username,)) if username is not None else ("", ())
+    conn.execute(f"DELETE FROM report_snapshots {where}", params)
+
+
+def is_closed(period, today=None):
+    # period is "YYYY-MM" or "YYYY"
+    today = today or date.today()
+    current = today.strftime("%Y-%m")[:len(period)]
+    return period < current
+
+
+def _bounds(period):
+    # First and last rollup month of the period
+    return (period, period) if len(period) == 7 else (f"{period}-01", f"{period}-12")
+
+
+def compute(conn, username, period):
+    first, last = _bounds(period)
+    params = (username, first, last)
+    where = "username = ? AND month BETWEEN ? AND ?"
+    total, count = conn.execute(
+        f"SELECT COALESCE(SUM(total), 0), COALESCE(SUM(count), 0) FROM monthly_rollup WHERE {where}", params
+    ).fetchone()
+    categories = conn.execute(
+        f"""SELECT category, SUM(total), ROUND(SUM(total) / SUM(count), 2), SUM(count)
+            FROM monthly_rollup WHERE {where} GROUP BY category HAVING SUM(count) > 0 ORDER BY 2 DESC""",
+        params,
+    ).fetchall()
+    months = conn.execute(
+        f"""SELECT month, SUM(total), SUM(count) FROM monthly_rollup WHERE {where}
+            GROUP BY month HAVING SUM(count) > 0 ORDER BY month""",
+        params,
+    ).fetchall()
+    # Only a month's daily average needs the last expense date, so a year
+    # never opens its archive
+    last_date = None
+    if len(period) == 7 and count:
+        last_date = conn.execute(
+            f"SELECT MAX(date) FROM {archive.source(conn, first, last)} WHERE username = ? AND date >= ? AND date < ?",
+            (username, f"{first}-01", f"{last}-32"),
+        ).fetchone()[0]
+    return {
+        "period": period,
+        "total": total,
+        "count": count,
+        "last_date": last_date,
+        "categories": [dict(zip(("category", "amount", "average", "count"), row)) for row in categories],
+        "months": [dict(zip(("month", "amount", "count"), row)) for row in months],
+    }
+
+
+def load(conn, username, period):
+    row = conn.execute("SELECT payload FROM report_snapshots WHERE username = ? AND period = ?",
+                       (username, period)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def store(conn, username, period):
+    # Computes and saves one snapshot atomically with respect to expense writes;
+    # archived years are attached first, since ATTACH cannot run in a transaction
+    archive.source(conn, *_bounds(period))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        snapshot = compute(conn, username, period)
+        conn.execute("INSERT OR REPLACE INTO report_snapshots (username, period, payload) VALUES (?, ?, ?)",
+                     (username, period, json.dumps(snapshot)))
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return snapshot
+
+
+def report(conn, username, period, today=None):
+    # Closed periods come from their snapshot when one is built; everything
+    # else is computed live, so the Reports page and the API never write
+    if is_closed(period, today):
+        snapshot = load(conn, username, period)
+        if snapshot is not None:
+            return snapshot
+    return compute(conn, username, period)
+
+
+def missing(conn, username=None, today=None):
+    # (username, period) pairs of closed months and years with data but no snapshot
+    today = today or date.today()
+    user_filter, params = ("AND username = ?", [username]) if username is not None else ("", [])
+    return conn.execute(
+        f"""SELECT DISTINCT username, period FROM (
+                SELECT username, month AS period FROM monthly_rollup WHERE count > 0 {user_filter}
+                UNION ALL
+                SELECT username, substr(month, 1, 4) FROM monthly_rollup WHERE count > 0 {user_filter}
+            ) AS periods
+            WHERE ((length(period) = 7 AND period < ?) OR (length(period) = 4 AND period < ?))
+              AND NOT EXISTS (SELECT 1 FROM report_snapshots s
+                              WHERE s.username = periods.username AND s.period = periods.period)""",
+        params + params + [today.strftime("%Y-%m"), today.strftime("%Y")],
+    ).fetchall()
+
+
+def build(conn, username=None, today=None):
+    # Materializes every missing closed-period snapshot; returns how many
+    built = 0
+    for user, period in missing(conn, username, today):
+        store(conn, user, period)
+        built += 1
+    return built
+
+
+def build_all(backend, username=None):
+    built = 0
+    for pool in backend.pools():
+        with pool.connection() as conn:
+            built += build(conn, username)
+    return built
@@ -0,0 +1,246 @@
+import argparse
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from abc import ABC, abstractmethod
+
+import alerts
+import archive
+import budget_counters
+import db
+import expenses
+import rollups
+import versions
+import writer
+from cache import expense_cache
+
+# ------------------ Storage Backends ------------------
+# Every read and write the app makes is scoped to one username, so a backend
+# only has to route a username to a connection. Three are provided:
+#   - SQLiteBackend: one database file (the default)
+#   - ShardedBackend: N database files, each user living in the one picked by
+#     a stable hash of the username, so writers for different users mostly
+#     take different SQLite write locks
+#   - MemoryBackend: a private in-memory database behind one connection, for
+#     benchmarks and trying the app without a database file
+# Pick one with EXPENSE_BACKEND=sqlite|sharded|memory; EXPENSE_SHARDS sets the
+# shard count. Existing data is split into shards with `python storage.py split`.
+
+BACKEND = os.environ.get("EXPENSE_BACKEND", "sqlite")
+SHARDS = int(os.environ.get("EXPENSE_SHARDS", "4"))
+
+# Tables holding per-user rows, copied when splitting a database into shards.
+# Derived tables (monthly_rollup, budget_counters, notes_fts) are rebuilt
+# instead; report_snapshots and budget_alerts are rebuilt by the background
+# jobs.
+USER_TABLES = ["users", "budgets", "expenses", "data_versions"]
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+class Backend(ABC):
+    @abstractmethod
+    def pools(self):
+        # Every underlying database, for maintenance and cross-user jobs
+        pass
+
+    @abstractmethod
+    def pool_for(self, username):
+        pass
+
+    def connection(self, username):
+        return self.pool_for(username).connection()
+
+    def close(self):
+        for pool in self.pools():
+            pool.close()
+
+    # ------------------ Users ------------------
+    def create_user(self, username, password_hash, created_at):
+        # The username primary key rejects duplicates, even from concurrent signups
+        with self.connection(username) as conn:
+            try:
+                with conn:
+                    conn.execute("INSERT INTO users (username, password, created_at) VALUES (?, ?, ?)",
+                                 (username, password_hash, created_at))
+            except sqlite3.IntegrityError:
+                return False
+        return True
+
+    def check_password(self, username, password_hash):
+        with self.connection(username) as conn:
+            row = conn.execute("SELECT 1 FROM users WHERE username=? AND password=?",
+                               (username, password_hash)).fetchone()
+        return row is not None
+
+    # ------------------ Budgets ------------------
+    def set_budget(self, username, amount):
+        with self.connection(username) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO budgets (username, monthly_budget) VALUES (?, ?)",
+                         (username, amount))
+            versions.bump(conn, username)
+        expense_cache.bump(username)
+
+    def take_budget_alert(self, username):
+        # This month's alert from the last alert job run, or None once shown
+        with self.connection(username) as conn:
+            return alerts.take_unseen(conn, username)
+
+    # ------------------ Expenses ------------------
+    def add_expense(self, username, expense_date, category, amount, note, payment_method, allow_duplicate=True):
+        # Returns the new expense id once it is committed, or None if it was
+        # an exact duplicate and allow_duplicate is off
+        if writer.ENABLED:
+            return self.writer_for(username).submit(username, expense_date, category, amount, note, payment_method,
+                                                    allow_duplicate)
+        with self.connection(username) as conn:
+            return expenses.add_expense(conn, username, expense_date, category, amount, note, payment_method,
+                                        allow_duplicate)
+
+    def writer_for(self, username):
+        # One group-commit writer per database, started on first use
+        pool = self.pool_for(username)
+        with _writers_lock:
+            if pool not in _writers:
+                _writers[pool] = writer.GroupCommitWriter(pool)
+            return _writers[pool]
+
+    def writer_stats(self):
+        with _writers_lock:
+            writers = [_writers[pool] for pool in self.pools() if pool in _writers]
+        return [w.stats() for w in writers]
+
+    def query(self, username, query, *args):
+        # query is one of the queries.py read functions, called with (conn, username, *args)
+        with self.connection(username) as conn:
+            return query(conn, username, *args)
+
+
+class SQLiteBackend(Backend):
+    def __init__(self, path=None):
+        self.pool = db.get_pool(path)
+
+    def pools(self):
+        return [self.pool]
+
+    def pool_for(self, username):
+        return self.pool
+
+
+def shard_index(username, shards):
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(username.encode("utf-8")) % shards
+
+
+def shard_paths(base=None, shards=SHARDS):
+    root, ext = os.path.splitext(base or db.DB_PATH)
+    return [f"{root}-shard{i}{ext or '.db'}" for i in range(shards)]
+
+
+class ShardedBackend(Backend):
+    def __init__(self, paths=None):
+        self.shards = [db.get_pool(path) for path in (paths or shard_paths())]
+
+    def pools(self):
+        return list(self.shards)
+
+    def pool_for(self, username):
+        return self.shards[shard_index(username, len(self.shards))]
+
+
+_memory_ids = itertools.count()
+
+
+class MemoryBackend(Backend):
+    # Several connections to one shared-cache memory database fail with
+    # "database table is locked" instead of waiting, so the pool holds a
+    # single connection and sessions take turns checking it out. The database
+    # lives as long as that connection.
+    def __init__(self, name=None):
+        self.path = f"file:{name or f'expenses-{next(_memory_ids)}'}?mode=memory"
+        self.pool = db.get_pool(self.path, size=1)
+
+    def pools(self):
+        return [self.pool]
+
+    def pool_for(self, username):
+        return self.pool
+
+    def close(self):
+        db.close_pool(self.path)
+
+
+BACKENDS = {"sqlite": SQLiteBackend, "sharded": ShardedBackend, "memory": MemoryBackend}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if BACKEND not in BACKENDS:
+                raise RuntimeError(f"Unknown EXPENSE_BACKEND {BACKEND!r}; expected one of {', '.join(BACKENDS)}")
+            _backend = BACKENDS[BACKEND]()
+        return _backend
+
+
+def set_backend(backend):
+    # For tests and benchmarks that bring their own backend
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# ------------------ Splitting Into Shards ------------------
+def split(source, paths):
+    # Copies each user's rows from a single database into their shard and
+    # rebuilds the derived tables there; returns the user count per shard
+    with db.connection(source) as conn:  # also brings the source schema up to date
+        if archive.archived_years(conn):
+            raise RuntimeError("split the database before archiving years; archived expenses are not copied")
+    counts = []
+    for index, path in enumerate(paths):
+        with db.connection(path) as conn:
+            conn.create_function("shard_index", 2, shard_index, deterministic=True)
+            conn.execute("ATTACH DATABASE ? AS source", (source,))
+            try:
+                with conn:
+                    for table in USER_TABLES:
+                        columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_info({table})"))
+                        conn.execute(
+                            f"""INSERT OR IGNORE INTO main.{table} ({columns})
+                                SELECT {columns} FROM source.{table}
+                                WHERE shard_index(username, ?) = ?""",
+                            (len(paths), index),
+                        )
+                    rollups.rebuild(conn)
+                    budget_counters.rebuild(conn)
+            finally:
+                conn.execute("DETACH DATABASE source")
+            counts.append(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0])
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Storage backend maintenance.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split_parser = commands.add_parser("split", help="copy a single database into username shards")
+    split_parser.add_argument("source", nargs="?", default=db.DB_PATH)
+    split_parser.add_argument("--shards", type=int, default=SHARDS)
+    args = parser.parse_args(argv)
+
+    paths = shard_paths(args.source, args.shards)
+    for path, users in zip(paths, split(args.source, paths)):
+        print(f"{path}: {users} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import streamlit as st
+
+# ------------------ Custom CSS ------------------
+# Styles the login screen needs go out on every run; the rest only once a
+# user is logged in.
+
+BASE_CSS = """
+    <style>
+    /* Dark theme background */
+    .main {
+        background-color: #0e1117;
+    }
+    .stApp {
+        background-color: #0e1117;
+    }
+    
+    /* Text colors */
+    .big-font {
+        font-size: 24px !important;
+        font-weight: bold;
+        color: #667eea;
+    }
+    
+    h1, h2, h3, h4, h5, h6 {
+        color: #ffffff !important;
+    }
+    
+    p, label, .stMarkdown {
+        color: #e0e0e0;
+    }
+    
+    /* Button styling */
+    .stButton>button {
+        border-radius: 10px;
+        font-weight: bold;
+        transition: all 0.3s;
+        background-color: #667eea;
+        color: white;
+        border: none;
+    }
+    
+    .stButton>button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.5);
+        background-color: #764ba2;
+    }
+    
+    /* Input fields */
+    .stTextInput input, .stNumberInput input, .stSelectbox select, .stDateInput input {
+        background-color: #262b3d;
+        color: #ffffff;
+        border: 1px solid #3d4455;
+        border-radius: 8px;
+    }
+    
+    .stTextArea textarea {
+        background-color: #262b3d;
+        color: #ffffff;
+        border: 1px solid #3d4455;
+        border-radius: 8px;
+    }
+    
+    /* Info boxes */
+    .stAlert {
+        background-color: #1a1d29;
+        border: 1px solid #3d4455;
+        border-radius: 10px;
+    }
+    
+    /* Form styling */
+    .stForm {
+        background-color: #1a1d29;
+        border: 1px solid #3d4455;
+        border-radius: 10px;
+        padding: 20px;
+    }
+    </style>
+"""
+
+APP_CSS = """
+    <style>
+    /* Sidebar styling */
+    [data-testid="stSidebar"] {
+        background-color: #1a1d29;
+    }
+    
+    /* Metrics styling */
+    div[data-testid="stMetricValue"] {
+        font-size: 28px;
+        font-weight: bold;
+        color: #ffffff;
+    }
+    
+    div[data-testid="stMetricLabel"] {
+        color: #b0b0b0;
+    }
+    
+    div[data-testid="stMetricDelta"] {
+        color: #4ade80;
+    }
+    
+    /* Success box */
+    .success-box {
+        padding: 20px;
+        border-radius: 10px;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        text-align: center;
+        margin: 20px 0;
+        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
+    }
+    
+    /* Dataframe styling */
+    .stDataFrame {
+        background-color: #1a1d29;
+    }
+    
+    /* Progress bar */
+    .stProgress > div > div {
+        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+    }
+    
+    /* Tab styling */
+    .stTabs [data-baseweb="tab-list"] {
+        gap: 8px;
+        background-color: transparent;
+    }
+    
+    .stTabs [data-baseweb="tab"] {
+        background-color: #262b3d;
+        color: #e0e0e0;
+        border-radius: 8px;
+        padding: 10px 20px;
+    }
+    
+    .stTabs [aria-selected="true"] {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+    }
+    </style>
+"""
+
+
+def apply(logged_in):
+    st.markdown(BASE_CSS + APP_CSS if logged_in else BASE_CSS, unsafe_allow_html=True)
@@ -0,0 +1,62 @@
+import numpy as np
+import plotly.express as px
+
+# ------------------ Spending Trends ------------------
+# Long date ranges are aggregated to weeks or months in SQL, optionally
+# thinned with Largest-Triangle-Three-Buckets (which keeps the visual peaks
+# that a plain stride would drop), and drawn with WebGL once the series is
+# too long for SVG to stay responsive.
+
+RESOLUTIONS = ["Auto", "Day", "Week", "Month"]
+TITLES = {"Day": "Daily Spending Trend", "Week": "Weekly Spending Trend", "Month": "Monthly Spending Trend"}
+DAILY_MAX_DAYS = 366
+WEEKLY_MAX_DAYS = 5 * 366
+MAX_POINTS = 1000
+WEBGL_THRESHOLD = 1000
+MARKER_LIMIT = 120
+
+
+def pick_resolution(start, end, choice="Auto"):
+    if choice != "Auto":
+        return choice
+    days = (end - start).days + 1
+    if days <= DAILY_MAX_DAYS:
+        return "Day"
+    if days <= WEEKLY_MAX_DAYS:
+        return "Week"
+    return "Month"
+
+
+def lttb(df, x, y, threshold=MAX_POINTS):
+    # Keeps the first and last rows and, from each of threshold - 2 buckets,
+    # the row forming the largest triangle with its neighbours' picks
+    n = len(df)
+    if threshold >= n or threshold < 3:
+        return df
+    xs = df[x].to_numpy(dtype="datetime64[s]").astype(np.float64) if np.issubdtype(df[x].dtype, np.datetime64) \
+        else df[x].to_numpy(dtype=np.float64)
+    ys = df[y].to_numpy(dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket, or the last point for the final bucket
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        areas = np.abs((xs[a] - cx) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (cy - ys[a]))
+        a = lo + int(areas.argmax())
+        keep.append(a)
+    keep.append(n - 1)
+    return df.iloc[keep]
+
+
+def trend_figure(df, resolution, downsample=True):
+    if downsample:
+        df = lttb(df, "date", "amount")
+    fig = px.line(df, x="date", y="amount",
+                  title=TITLES[resolution],
+                  markers=len(df) <= MARKER_LIMIT,
+                  render_mode="webgl" if len(df) > WEBGL_THRESHOLD else "svg")
+    fig.update_traces(line_color='#667eea', line_width=3 if len(df) <= MARKER_LIMIT else 1.5)
+    return fig
@@ -0,0 +1,19 @@
+# ------------------ Data Versions ------------------
+# data_versions counts writes per user. Every write path bumps it in the
+# same transaction as the write, so any process reading the database (the
+# JSON API in particular) can tell whether a user's data changed since it
+# last looked, with one primary-key lookup. The in-process result caches use
+# their own counters (see cache.py).
+
+BUMP_SQL = """INSERT INTO data_versions (username, version) VALUES (?, 1)
+              ON CONFLICT (username) DO UPDATE SET version = version + 1"""
+
+
+def bump(conn, username):
+    # Runs inside the caller's transaction
+    conn.execute(BUMP_SQL, (username,))
+
+
+def get(conn, username):
+    row = conn.execute("SELECT version FROM data_versions WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else 0
@@ -0,0 +1,32 @@
+import importlib
+
+import streamlit as st
+
+# ------------------ Pages ------------------
+# Each page lives in its own module and is imported the first time it is
+# opened, so the login screen never loads pandas, plotly or the query layer.
+
+# Navigation label -> (icon, module)
+PAGES = {
+    "Dashboard": ("📊", "dashboard"),
+    "Add Expense": ("➕", "add_expense"),
+    "View Expenses": ("📋", "history"),
+    "Analysis": ("📈", "analysis"),
+    "Budget Manager": ("💵", "budget"),
+    "Reports": ("📑", "reports"),
+}
+ADMIN_PAGES = {
+    "Performance": ("⏱️", "performance"),
+}
+
+
+def render(page):
+    _, module = PAGES.get(page) or ADMIN_PAGES[page]
+    importlib.import_module(f"views.{module}").render()
+
+
+# ------------------ Export ------------------
+def discard_export():
+    prepared = st.session_state.pop("export", None)
+    if prepared:
+        prepared["file"].close()
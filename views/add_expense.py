@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import formatting
+import importer
+import queries
+import storage
+from views.common import cached
+
+
+# ------------------ Add Expense ------------------
+def render():
+    st.header("➕ Add a New Expense")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        with st.form("expense_form", clear_on_submit=True):
+            date = st.date_input("📅 Date", datetime.today())
+            
+            col_a, col_b = st.columns(2)
+            with col_a:
+                category = st.selectbox("🏷️ Category", queries.CATEGORIES)
+            with col_b:
+                payment_method = st.selectbox("💳 Payment Method", queries.PAYMENT_METHODS)
+            
+            amount = st.number_input("💰 Amount (₹)", min_value=0.0, step=10.0, format="%.2f")
+            note = st.text_area("📝 Note (optional)", placeholder="Add a description...")
+            
+            submitted = st.form_submit_button("💾 Add Expense", use_container_width=True, type="primary")
+            
+        if submitted:
+            if amount > 0:
+                expense = (date, category, amount, note, payment_method)
+                if storage.get_backend().add_expense(st.session_state.username, *expense, allow_duplicate=False):
+                    st.session_state.pop("duplicate_expense", None)
+                    st.success("✅ Expense added successfully!")
+                else:
+                    # Usually a double submission; kept so a genuine repeat can still be added
+                    st.session_state.duplicate_expense = expense
+            else:
+                st.error("Please enter a valid amount")
+        
+        if "duplicate_expense" in st.session_state:
+            duplicate = st.session_state.duplicate_expense
+            notice = st.empty()
+            notice.warning(f"⚠️ An identical expense ({duplicate[1]}, {formatting.currency(duplicate[2])} on "
+                           f"{duplicate[0]}) is already recorded, so this one was not added.")
+            add_anyway = st.empty()
+            if add_anyway.button("➕ Add it anyway", use_container_width=True):
+                storage.get_backend().add_expense(st.session_state.username, *st.session_state.pop("duplicate_expense"))
+                add_anyway.empty()
+                notice.success("✅ Expense added successfully!")
+        
+        # Bulk import
+        st.markdown("### 📥 Import from CSV")
+        uploaded = st.file_uploader("CSV with Date, Category, Amount and optional Note / Payment Method columns",
+                                    type="csv")
+        if uploaded is not None and st.button("📥 Import Expenses", use_container_width=True):
+            progress_bar = st.progress(0.0, text="Importing...")
+            total_bytes = max(uploaded.size, 1)
+            
+            def report_progress(rows_read, rows_imported):
+                progress_bar.progress(min(uploaded.tell() / total_bytes, 1.0),
+                                      text=f"{rows_imported:,} of {rows_read:,} rows imported")
+            
+            try:
+                with storage.get_backend().connection(st.session_state.username) as conn:
+                    result = importer.import_file(conn, st.session_state.username, uploaded,
+                                                  progress=report_progress)
+            except ValueError as e:
+                st.error(f"Could not import file: {e}")
+            else:
+                progress_bar.progress(1.0, text="Import complete")
+                st.success(f"✅ Imported {result.imported:,} expenses in {result.seconds:.1f}s")
+                if result.duplicates:
+                    st.info(f"ℹ️ Skipped {result.duplicates:,} rows already recorded")
+                if result.rejected_count:
+                    st.warning(f"⚠️ {result.rejected_count:,} rows were rejected")
+                    st.dataframe(pd.DataFrame([(line, reason, ",".join(row)) for line, reason, row in result.rejected],
+                                              columns=["Line", "Reason", "Row"]),
+                                 use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.markdown("### 💡 Quick Tips")
+        st.info("📌 Add expenses daily for accurate tracking")
+        st.info("🏷️ Use proper categories for better insights")
+        st.info("📝 Add notes to remember details")
+        
+        # Quick stats
+        if cached(queries.has_expenses):
+            today = datetime.today().date()
+            today_spent = cached(queries.spent_between, today, today)
+            st.metric("💸 Today's Spending", formatting.currency(today_spent))
@@ -0,0 +1,91 @@
+import plotly.express as px
+import streamlit as st
+
+import formatting
+import queries
+import trends
+from views.common import cached, show_cached_chart
+
+
+# ------------------ Analysis ------------------
+def render():
+    st.header("📈 Expense Analysis")
+    
+    first_date, last_date = cached(queries.date_bounds)
+    
+    if first_date is None:
+        st.info("No expenses to analyze")
+    else:
+        # Date Range Filter
+        default_start = cached(queries.filter_start, first_date, last_date)
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("Start Date", default_start, key="analysis_start")
+        with col2:
+            end_date = st.date_input("End Date", last_date, key="analysis_end")
+        if default_start > first_date:
+            st.caption(f"🗄️ Expenses before {default_start.year} are archived; pick an earlier start date to include them")
+        
+        stats = cached(queries.totals, start_date, end_date)
+        
+        # Key Metrics
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("💸 Total Spent", formatting.currency(stats['total']))
+        col2.metric("📊 Transactions", stats["count"])
+        col3.metric("📈 Average", formatting.currency(stats['average']))
+        col4.metric("🔝 Highest", formatting.currency(stats['max']))
+        
+        st.markdown("---")
+        
+        # Charts
+        tab1, tab2, tab3 = st.tabs(["📊 Category Analysis", "📅 Time Analysis", "💳 Payment Methods"])
+        
+        with tab1:
+            col1, col2 = st.columns(2)
+            with col1:
+                def category_bar(start, end):
+                    return px.bar(cached(queries.category_totals, start, end), x='category', y='amount', 
+                                  title="Spending by Category",
+                                  color='amount',
+                                  color_continuous_scale='Viridis')
+                show_cached_chart(category_bar, start_date, end_date)
+            
+            with col2:
+                def category_pie(start, end):
+                    return px.pie(cached(queries.category_totals, start, end), names='category', values='amount',
+                                  title="Category Distribution",
+                                  hole=0.4,
+                                  color_discrete_sequence=px.colors.qualitative.Set3)
+                show_cached_chart(category_pie, start_date, end_date)
+        
+        with tab2:
+            # Spending trend, bucketed by day, week or month
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                resolution_choice = st.radio("Resolution", trends.RESOLUTIONS, horizontal=True, key="trend_resolution")
+            with col2:
+                downsample = st.toggle("Downsample long series", value=True, key="trend_downsample")
+            resolution = trends.pick_resolution(start_date, end_date, resolution_choice)
+            
+            def trend_line(start, end, resolution, downsample):
+                return trends.trend_figure(cached(queries.trend_totals, start, end, resolution), resolution, downsample)
+            show_cached_chart(trend_line, start_date, end_date, resolution, downsample)
+            
+            # Day of week analysis
+            def weekday_bar(start, end):
+                return px.bar(cached(queries.weekday_totals, start, end), x='day_of_week', y='amount',
+                              title="Spending by Day of Week",
+                              color='amount',
+                              color_continuous_scale='Blues')
+            show_cached_chart(weekday_bar, start_date, end_date)
+        
+        with tab3:
+            payment_sum = cached(queries.payment_totals, start_date, end_date)
+            if not payment_sum.empty:
+                def payment_pie(start, end):
+                    return px.pie(cached(queries.payment_totals, start, end), names='payment_method', values='amount',
+                                  title="Payment Method Distribution",
+                                  color_discrete_sequence=px.colors.qualitative.Pastel)
+                show_cached_chart(payment_pie, start_date, end_date)
+            else:
+                st.info("💡 Payment method data not available for older expenses")
@@ -0,0 +1,55 @@
+import streamlit as st
+
+import core
+import formatting
+import queries
+from views.common import budget_status, cached, set_budget
+
+
+# ------------------ Budget Manager ------------------
+def render():
+    st.header("💵 Budget Manager")
+    
+    status = budget_status()
+    current_budget = status["budget"]
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("### 🎯 Set Monthly Budget")
+        with st.form("budget_form"):
+            new_budget = st.number_input("Monthly Budget (₹)", 
+                                        min_value=0.0, 
+                                        value=float(current_budget),
+                                        step=1000.0,
+                                        format="%.2f")
+            submitted = st.form_submit_button("💾 Save Budget", use_container_width=True)
+            
+        if submitted:
+            set_budget(st.session_state.username, new_budget)
+            st.success("✅ Budget updated successfully!")
+    
+    with col2:
+        st.markdown("### 📊 Current Status")
+        if current_budget > 0:
+            if cached(queries.has_expenses):
+                progress = core.budget_progress(current_budget, status["spent"])
+                current_month_spent = progress["spent"]
+                remaining = progress["remaining"]
+                percentage = progress["percentage"]
+                
+                st.metric("💰 Budget", formatting.currency(current_budget))
+                st.metric("💸 Spent", formatting.currency(current_month_spent), 
+                         delta=f"-{formatting.currency(current_month_spent)}", delta_color="inverse")
+                st.metric("💵 Remaining", formatting.currency(remaining))
+                
+                st.progress(min(percentage / 100, 1.0))
+                
+                if percentage > 100:
+                    st.error(f"⚠️ You've exceeded your budget by {formatting.currency(abs(remaining))}")
+                elif percentage > 90:
+                    st.warning(f"⚠️ You've used {percentage:.1f}% of your budget")
+                else:
+                    st.success(f"✅ You're doing great! {100-percentage:.1f}% budget remaining")
+        else:
+            st.info("💡 Set a monthly budget to track your spending goals")
@@ -0,0 +1,58 @@
+from datetime import date
+
+import streamlit as st
+
+import budget_counters
+import formatting
+import frames
+import instrumentation
+import queries
+import storage
+from cache import expense_cache, figure_cache
+
+
+# ------------------ Budget Functions ------------------
+def budget_status():
+    # Budget and month-to-date spend in one lookup; keyed by day so it rolls over
+    return cached(budget_counters.budget_status, date.today())
+
+
+def set_budget(username, amount):
+    storage.get_backend().set_budget(username, amount)
+
+
+# ------------------ Cached Queries ------------------
+# Results are reused until the user's data version changes, so switching
+# pages without writing anything does not touch SQLite.
+def cached(query, *args):
+    username = st.session_state.username
+    def load():
+        with instrumentation.timer(f"query:{query.__name__}"):
+            return storage.get_backend().query(username, query, *args)
+    return expense_cache.get(username, (query.__name__,) + args, load)
+
+
+def show_expenses(df, columns=formatting.EXPENSE_TABLE_COLUMNS):
+    # Frames hold integer paise and no notes; both are filled in only for the rows shown
+    dates = (df["date"].min().date(), df["date"].max().date()) if len(df) else ()
+    notes = cached(queries.expense_notes, tuple(df["id"].tolist()), *dates)
+    with instrumentation.timer(f"table:{st.session_state.user_choice}"):
+        formatting.expense_table(df.assign(amount=frames.rupees(df), note=df["id"].map(notes)), columns)
+
+
+# ------------------ Charts ------------------
+def show_chart(fig):
+    name = fig.layout.title.text or "untitled"
+    with instrumentation.timer(f"chart:{st.session_state.user_choice}/{name}"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def show_cached_chart(build, *args):
+    # build(*args) fetches its own data through cached(), so a write that lands
+    # while it runs keeps the figure out of the cache; filters go in args
+    username = st.session_state.username
+    key = (st.session_state.user_choice, build.__name__) + args
+    def load():
+        with instrumentation.timer(f"figure:{st.session_state.user_choice}/{build.__name__}"):
+            return build(*args)
+    show_chart(figure_cache.get(username, key, load))
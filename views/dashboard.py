@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import plotly.express as px
+import streamlit as st
+
+import core
+import formatting
+import queries
+from views.common import budget_status, cached, show_expenses, show_cached_chart
+
+
+# ------------------ Dashboard ------------------
+def render():
+    st.header("📊 Dashboard Overview")
+    
+    summary = cached(queries.dashboard_summary, datetime.today().date())
+    
+    if summary["count"] == 0:
+        st.info("🎯 No expenses yet. Start tracking by adding your first expense!")
+    else:
+        # Current month calculations
+        total_spent = summary["total"]
+        status = budget_status()
+        progress = core.budget_progress(status["budget"], status["spent"])
+        monthly_spent = progress["spent"]
+        
+        # Get budget
+        budget = progress["budget"]
+        budget_remaining = progress["remaining"]
+        budget_percentage = progress["percentage"]
+        
+        # Last 7 days
+        weekly_spent = summary["week"]
+        
+        # Metrics Row
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("💸 Total Spent", formatting.currency(total_spent))
+        col2.metric("📅 This Month", formatting.currency(monthly_spent), 
+                   delta=f"{budget_percentage:.1f}% of budget" if budget > 0 else None)
+        col3.metric("📆 Last 7 Days", formatting.currency(weekly_spent))
+        col4.metric("💰 Budget Left", formatting.currency(budget_remaining) if budget > 0 else "Not Set")
+        
+        # Budget Progress Bar
+        if budget > 0:
+            st.markdown("### 📊 Monthly Budget Progress")
+            progress_color = "🟢" if budget_percentage < 70 else "🟡" if budget_percentage < 90 else "🔴"
+            st.progress(min(budget_percentage / 100, 1.0))
+            st.caption(f"{progress_color} You've used {budget_percentage:.1f}% of your monthly budget")
+        
+        st.markdown("---")
+        
+        # Charts Row
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Category Breakdown
+            def category_pie():
+                fig1 = px.pie(cached(queries.rollup_category_totals), names='category', values='amount', 
+                             title="💳 Spending by Category",
+                             color_discrete_sequence=px.colors.qualitative.Pastel,
+                             hole=0.4)
+                fig1.update_traces(textposition='inside', textinfo='percent+label')
+                return fig1
+            show_cached_chart(category_pie)
+        
+        with col2:
+            # Monthly Trend
+            def monthly_bar():
+                fig2 = px.bar(cached(queries.monthly_totals), x='month', y='amount', 
+                             title="📅 Monthly Spending Trend",
+                             color='amount',
+                             color_continuous_scale='Blues')
+                fig2.update_layout(xaxis_title="Month", yaxis_title="Amount (₹)")
+                return fig2
+            show_cached_chart(monthly_bar)
+        
+        # Recent Transactions
+        st.markdown("### 📝 Recent Transactions")
+        recent_df = cached(queries.recent_expenses, 10)
+        show_expenses(recent_df, ['date', 'category', 'amount', 'note', 'payment_method'])
+        
+        # Quick Stats
+        st.markdown("### 🎯 Quick Insights")
+        col1, col2, col3 = st.columns(3)
+        
+        avg_expense = summary["average"]
+        max_expense = summary["max"]
+        top_category = cached(queries.rollup_category_totals)["category"].iloc[0]
+        
+        col1.info(f"📊 **Average Expense:** {formatting.currency(avg_expense)}")
+        col2.info(f"🔝 **Highest Expense:** {formatting.currency(max_expense)}")
+        col3.info(f"🎯 **Top Category:** {top_category}")
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+import streamlit as st
+
+import exporter
+import formatting
+import queries
+import storage
+from views import discard_export
+from views.common import cached, show_expenses
+
+PAGE_SIZE = 50
+SEARCH_LIMIT = 200
+
+
+# ------------------ View Expenses ------------------
+def render():
+    st.header("📋 Expense History")
+    
+    first_date, last_date = cached(queries.date_bounds)
+    
+    if first_date is None:
+        st.info("No expenses added yet")
+    else:
+        # Filters
+        st.markdown("### 🔍 Filter Expenses")
+        col1, col2, col3, col4 = st.columns(4)
+        
+        user_categories = cached(queries.category_names)
+        default_start = cached(queries.filter_start, first_date, last_date)
+        with col1:
+            start_date = st.date_input("Start Date", default_start)
+        with col2:
+            end_date = st.date_input("End Date", last_date)
+        with col3:
+            category_filter = st.multiselect("Category", 
+                                            options=user_categories, 
+                                            default=user_categories)
+        with col4:
+            sort_order = st.selectbox("Sort By", list(queries.SORTS))
+        if default_start > first_date:
+            st.caption(f"🗄️ Expenses before {default_start.year} are archived; pick an earlier start date to include them")
+        search_text = ""
+        if cached(queries.note_search_available):
+            search_text = st.text_input("🔎 Search Notes", placeholder="e.g. rent, flight, groc")
+        
+        # Selecting every category is the same as not filtering, which lets
+        # SQLite walk the (username, date) index instead of sorting
+        selected_categories = None if set(category_filter) >= set(user_categories) else tuple(category_filter)
+        stats = cached(queries.totals, start_date, end_date, selected_categories)
+        
+        # Summary
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📊 Total Expenses", stats["count"])
+        col2.metric("💸 Total Amount", formatting.currency(stats['total']))
+        col3.metric("📈 Average", formatting.currency(stats['average']))
+        
+        st.markdown("---")
+        
+        search_results = None
+        if search_text.strip():
+            search_results = cached(queries.search_expenses, search_text.strip(), start_date, end_date,
+                                    selected_categories, SEARCH_LIMIT)
+        
+        if search_results is not None:
+            # Ranked matches replace the paginated history while searching
+            if search_results.empty:
+                st.info(f"No notes match \"{search_text.strip()}\"")
+            else:
+                matches = len(search_results)
+                st.caption(f"Top {matches:,} matches" if matches == SEARCH_LIMIT
+                           else f"{matches:,} matching expense{'s' if matches != 1 else ''}")
+                show_expenses(search_results)
+        else:
+            # Keyset pagination: remember the cursor that starts each visited page
+            # and go back to the first page whenever the filters change
+            page_key = (st.session_state.username, start_date, end_date, selected_categories, sort_order)
+            if st.session_state.get("page_key") != page_key:
+                st.session_state.page_key = page_key
+                st.session_state.page_cursors = [None]
+            page_cursors = st.session_state.page_cursors
+            page_number = len(page_cursors)
+            total_pages = max(-(-stats["count"] // PAGE_SIZE), 1)
+        
+            page_df, next_cursor = cached(queries.expense_page, start_date, end_date, selected_categories,
+                                          sort_order, page_cursors[-1], PAGE_SIZE)
+        
+            show_expenses(page_df)
+        
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("◀ Previous", use_container_width=True, disabled=page_number == 1):
+                    page_cursors.pop()
+                    st.rerun()
+            col2.markdown(f"<p style='text-align:center;'>Page {page_number} of {total_pages}</p>",
+                          unsafe_allow_html=True)
+            with col3:
+                if st.button("Next ▶", use_container_width=True, disabled=next_cursor is None):
+                    page_cursors.append(next_cursor)
+                    st.rerun()
+        
+        # Export - built only on request and streamed from the database
+        st.markdown("### 💾 Export")
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            export_format = st.selectbox("Format", exporter.available_formats(), label_visibility="collapsed")
+        export_key = (start_date, end_date, selected_categories, export_format)
+        with col2:
+            if st.button("📦 Prepare Export", use_container_width=True):
+                discard_export()
+                with storage.get_backend().connection(st.session_state.username) as conn:
+                    export_file = exporter.export(conn, st.session_state.username, export_format,
+                                                  start_date, end_date, selected_categories)
+                st.session_state.export = {"key": export_key, "file": export_file}
+        
+        prepared = st.session_state.get("export")
+        if prepared and prepared["key"] == export_key:
+            extension, mime = exporter.FORMATS[export_format]
+            prepared["file"].seek(0)
+            st.download_button(f"💾 Download {export_format}", data=prepared["file"].read(), 
+                             file_name=f'expenses_{datetime.now().strftime("%Y%m%d")}.{extension}', 
+                             mime=mime, use_container_width=True, on_click=discard_export)
@@ -0,0 +1,51 @@
+import pandas as pd
+import streamlit as st
+
+import formatting
+import instrumentation
+import storage
+from cache import expense_cache, figure_cache
+
+
+# ------------------ Performance ------------------
+def render():
+    st.header("⏱️ Performance")
+
+    if not instrumentation.ENABLED:
+        st.info("Instrumentation is off. Start the app with EXPENSE_METRICS=1 to record timings.")
+    elif instrumentation.LOG_PATH:
+        st.caption(f"Per-rerun records are appended to {instrumentation.LOG_PATH}")
+
+    stats = expense_cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🎯 Cache Hit Rate", f"{stats['hit_rate']:.1%}")
+    col2.metric("✅ Hits", f"{stats['hits']:,}")
+    col3.metric("❌ Misses", f"{stats['misses']:,}")
+    col4.metric("📦 Cached Entries", f"{stats['entries']:,} / {stats['users']:,} users")
+    figures = figure_cache.stats()
+    st.caption(f"📈 Figure cache: {figures['hit_rate']:.1%} hit rate, {figures['entries']:,} figures held")
+    
+    writers = storage.get_backend().writer_stats()
+    if writers:
+        batches = sum(w["batches"] for w in writers)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("📥 Write Queue Depth", f"{sum(w['queue_depth'] for w in writers):,}")
+        col2.metric("🧾 Commits", f"{batches:,}")
+        col3.metric("📦 Mean Batch", f"{sum(w['written'] for w in writers) / batches if batches else 0:.1f}")
+        col4.metric("🔝 Largest Batch", f"{max(w['largest_batch'] for w in writers):,}")
+
+    timings = pd.DataFrame([dict(name=name, **summary) for name, summary in instrumentation.snapshot().items()],
+                           columns=["name", "count", "mean_ms", "p50_ms", "p95_ms", "max_ms", "total_ms", "rows"])
+    kind = timings["name"].str.split(":", n=1).str[0]
+    for title, kinds in [("Reruns", ["rerun"]), ("Page Sections", ["query", "figure", "chart", "table"]),
+                         ("Writes", ["write"]), ("SQL Statements", ["sql"])]:
+        st.markdown(f"### {title}")
+        section = timings[kind.isin(kinds)].sort_values("total_ms", ascending=False)
+        if section.empty:
+            st.caption("Nothing recorded yet")
+        else:
+            formatting.timing_table(section)
+
+    if st.button("🗑️ Reset Timings"):
+        instrumentation.reset()
+        st.rerun()
@@ -0,0 +1,139 @@
+import calendar
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import core
+import formatting
+import queries
+from views.common import cached, show_expenses, show_cached_chart
+
+
+# ------------------ Reports ------------------
+# Month and year reports come from queries.period_report, which serves closed
+# periods from stored snapshots
+def report_frame(period, part):
+    return pd.DataFrame(cached(queries.period_report, period)[part])
+
+
+def render():
+    st.header("📑 Financial Reports")
+    
+    report_years = cached(queries.years)
+    
+    if not report_years:
+        st.info("No data available for reports")
+    else:
+        report_type = st.selectbox("📊 Select Report Type", 
+                                  ["Monthly Summary", "Category Breakdown", "Yearly Overview"])
+        
+        if report_type == "Monthly Summary":
+            month = st.selectbox("Select Month", 
+                                options=range(1, 13),
+                                format_func=lambda x: calendar.month_name[x])
+            year = st.selectbox("Select Year", 
+                               options=report_years)
+            
+            month_start, month_end = queries.month_bounds(year, month)
+            month_stats = cached(queries.period_report, f"{year}-{month:02d}")
+            
+            if month_stats["count"] > 0:
+                averages = core.period_averages(month_stats)
+                col1, col2, col3 = st.columns(3)
+                col1.metric("💸 Total Spent", formatting.currency(month_stats['total']))
+                col2.metric("📊 Transactions", month_stats["count"])
+                col3.metric("📈 Daily Average", formatting.currency(averages['daily_average']))
+                
+                # Category breakdown
+                def month_category_bar(year, month):
+                    return px.bar(report_frame(f"{year}-{month:02d}", "categories"),
+                                  x='category', y='amount',
+                                  title=f"Spending Breakdown - {calendar.month_name[month]} {year}",
+                                  color='amount',
+                                  color_continuous_scale='Plasma')
+                show_cached_chart(month_category_bar, year, month)
+                
+                monthly_df = cached(queries.expenses, month_start, month_end)
+                show_expenses(monthly_df)
+            else:
+                st.info("No expenses found for selected month")
+        
+        elif report_type == "Category Breakdown":
+            cat_data = cached(queries.rollup_category_totals)
+            
+            st.markdown("### 📊 Category Summary")
+            formatting.summary_table(cat_data)
+            
+            # Visualization
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Bar chart
+                def category_bar():
+                    return px.bar(cached(queries.rollup_category_totals), x='category', y='amount',
+                                  title="Total Spending by Category",
+                                  color='amount',
+                                  color_continuous_scale='Viridis')
+                show_cached_chart(category_bar)
+            
+            with col2:
+                # Pie chart
+                def category_pie():
+                    return px.pie(cached(queries.rollup_category_totals), names='category', values='amount',
+                                  title="Category Distribution",
+                                  color_discrete_sequence=px.colors.qualitative.Pastel,
+                                  hole=0.4)
+                show_cached_chart(category_pie)
+        
+        elif report_type == "Yearly Overview":
+            year = st.selectbox("Select Year", 
+                               options=report_years,
+                               key="year_report")
+            
+            year_stats = cached(queries.period_report, str(year))
+            
+            if year_stats["count"] > 0:
+                averages = core.period_averages(year_stats)
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("💸 Total Spent", formatting.currency(year_stats['total']))
+                col2.metric("📊 Transactions", year_stats["count"])
+                col3.metric("📅 Monthly Avg", formatting.currency(averages['monthly_average']))
+                col4.metric("📈 Daily Avg", formatting.currency(averages['daily_average']))
+                
+                st.markdown("---")
+                
+                # Monthly trend
+                def year_monthly_line(year):
+                    monthly_data = report_frame(str(year), "months")
+                    monthly_data["month"] = monthly_data["month"].apply(lambda x: calendar.month_name[int(x[5:7])])
+                    fig = px.line(monthly_data, x='month', y='amount',
+                                 title=f"📅 Monthly Spending Trend - {year}",
+                                 markers=True)
+                    fig.update_traces(line_color='#667eea', line_width=3)
+                    return fig
+                show_cached_chart(year_monthly_line, year)
+                
+                # Category breakdown for the year
+                st.markdown("### 📊 Category Breakdown")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    def year_category_bar(year):
+                        return px.bar(report_frame(str(year), "categories"),
+                                      x='category', y='amount',
+                                      title="Spending by Category",
+                                      color='amount',
+                                      color_continuous_scale='Blues')
+                    show_cached_chart(year_category_bar, year)
+                
+                with col2:
+                    def year_category_pie(year):
+                        return px.pie(report_frame(str(year), "categories"),
+                                      names='category', values='amount',
+                                      title="Category Distribution",
+                                      hole=0.4,
+                                      color_discrete_sequence=px.colors.qualitative.Set3)
+                    show_cached_chart(year_category_pie, year)
+            else:
+                st.info("No expenses found for selected year")
@@ -0,0 +1,102 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import expenses
+import instrumentation
+from cache import expense_cache
+
+# ------------------ Group Commit ------------------
+# One background writer per database drains queued expense inserts and
+# commits them together: after taking the first insert it keeps collecting
+# for up to WINDOW_MS (or MAX_BATCH inserts) and then writes the whole batch
+# in one transaction. Each submitter blocks on a future that resolves with
+# its expense id only after that commit, so an acknowledged expense is as
+# durable as one committed on its own. If a batch fails, its inserts are
+# retried one transaction each so only the bad insert reports an error.
+# EXPENSE_GROUP_COMMIT=0 turns it off.
+
+ENABLED = os.environ.get("EXPENSE_GROUP_COMMIT", "1").lower() not in ("0", "false", "no")
+WINDOW_MS = 2
+MAX_BATCH = 256
+SUBMIT_TIMEOUT = 30
+
+
+class GroupCommitWriter:
+    def __init__(self, pool, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.written = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"group-commit {pool.path}", daemon=True)
+        self._thread.start()
+
+    def submit(self, username, expense_date, category, amount, note, payment_method, allow_duplicate=True):
+        # Blocks until the insert is committed and returns the expense id (None
+        # for a refused duplicate)
+        future = Future()
+        self._queue.put((future, (username, expense_date, category, amount, note, payment_method, allow_duplicate)))
+        return future.result(timeout=SUBMIT_TIMEOUT)
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "written": self.written,
+            "mean_batch": self.written / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._write(batch)
+            except Exception as e:
+                # e.g. no connection could be checked out
+                for future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        with self.pool.connection() as conn:
+            try:
+                with conn:
+                    results = [(future, expenses.insert_expense(conn, *args)) for future, args in batch]
+            except Exception:
+                results = [self._write_one(conn, future, args) for future, args in batch]
+        if instrumentation.ENABLED:
+            instrumentation.record("write:batch", (time.perf_counter() - started) * 1000, len(batch))
+        self.batches += 1
+        self.written += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for username in {args[0] for _, args in batch}:
+            expense_cache.bump(username)
+        for future, expense_id in results:
+            if not future.done():
+                future.set_result(expense_id)
+
+    def _write_one(self, conn, future, args):
+        try:
+            with conn:
+                return future, expenses.insert_expense(conn, *args)
+        except Exception as e:
+            future.set_exception(e)
+            return future, None